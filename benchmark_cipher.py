@@ -0,0 +1,273 @@
+"""
+Benchmarks for cipher.py
+
+Run with:
+    python benchmark_cipher.py          # 1 MB, 10 MB and 100 MB inputs
+    python benchmark_cipher.py 1000     # up to 1 GB
+"""
+
+#=====importing libraries===========
+import io
+import itertools
+import json
+import os
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cipher
+
+
+# === Helper Functions ===
+def caesar_cipher_encode_before(message, shift):
+    """The original character by character encoder, for comparison."""
+
+    encoded_message = []
+
+    for char in message:
+        if char.isalpha():
+            start = ord('A') if char.isupper() else ord('a')
+            shifted_char = chr((ord(char) - start + shift) % 26 + start)
+            encoded_message.append(shifted_char)
+        else:
+            encoded_message.append(char)
+
+    return ''.join(encoded_message)
+
+def make_text(megabytes):
+    """Return about the given number of megabytes of text-like data."""
+
+    rng = random.Random(megabytes)
+    alphabet = string.ascii_letters + string.digits + " .,;:!?\n" + "     "
+    block = "".join(rng.choice(alphabet) for _ in range(1024 * 1024))
+    return block * megabytes
+
+def make_english(megabytes):
+    """Return about the given number of megabytes of English-looking text,
+    for the cracking benchmark."""
+
+    rng = random.Random(megabytes)
+    words = ("the of and to in is was that for it with as his on be at by had "
+             "are but from or have an they which one you were her all she there "
+             "would their we him been has when who will more no if out so said "
+             "what up its about into than them can only other new some could time "
+             "these two may then do first any my now such like our over man me "
+             "even most made after also did many before must through back years "
+             "where much your way well down should because each just those people").split()
+    block = " ".join(rng.choice(words) for _ in range(200_000))
+    block = (block * (1024 * 1024 // len(block) + 1))[:1024 * 1024]
+    return block * megabytes
+
+def crack_before(message):
+    """Brute force: decode the whole message with every shift using the
+    original encoder, and score each result."""
+
+    best = None
+    for shift in range(26):
+        decoded = caesar_cipher_encode_before(message, -shift)
+        score = cipher.score_shifts(cipher.letter_counts(decoded))[0]
+        if best is None or score < best[0]:
+            best = (score, shift, decoded)
+    return best[1], best[2]
+
+def time_it(function, *args):
+    """Return (result, seconds) for a function call."""
+
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+# === Benchmarks ===
+def benchmark_encode(sizes=(1, 10, 100), slow_limit=100):
+    """Compare the throughput of the old and new encoders, checking that
+    they give the same output."""
+
+    print("=== Caesar cipher encoding ===")
+    for megabytes in sizes:
+        text = make_text(megabytes)
+        data = text.encode("ascii")
+
+        new_text, new_seconds = time_it(cipher.caesar_cipher_encode, text, 15)
+        new_bytes, bytes_seconds = time_it(cipher.caesar_cipher_encode, data, 15)
+        assert new_bytes == new_text.encode("ascii")
+        assert cipher.caesar_cipher_decode(new_bytes, 15) == data
+
+        line = (f"{megabytes:>5} MB | str.translate {megabytes / new_seconds:8.1f} MB/s | "
+                f"bytes.translate {megabytes / bytes_seconds:8.1f} MB/s")
+
+        # The old encoder is very slow on large inputs
+        if megabytes <= slow_limit:
+            old_text, old_seconds = time_it(caesar_cipher_encode_before, text, 15)
+            assert old_text == new_text, "outputs differ"
+            line += f" | before {megabytes / old_seconds:6.1f} MB/s | identical output"
+        print(line)
+
+    # Non-ASCII letters go through the same rules as before
+    sample = "Ça va? Straße, ÀÉÎ õü 123"
+    assert cipher.caesar_cipher_encode(sample, 15) == caesar_cipher_encode_before(sample, 15)
+
+def benchmark_stream(sizes=(10, 100)):
+    """Measure streaming whole files through encode_file(), showing that
+    memory use doesn't grow with the file size."""
+
+    print("=== Streaming files ===")
+    with tempfile.TemporaryDirectory() as folder:
+        input_path = os.path.join(folder, "input.txt")
+        output_path = os.path.join(folder, "output.txt")
+
+        for megabytes in sizes:
+            block = make_text(1).encode("ascii")
+            with open(input_path, "wb") as input_file:
+                for _ in range(megabytes):
+                    input_file.write(block)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            cipher.encode_file(input_path, output_path, 15)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+
+            print(f"{megabytes:>5} MB | {megabytes / seconds:8.1f} MB/s | peak memory {peak:6.1f} MB")
+
+def benchmark_crack(sizes=(1, 4), sample_size=64 * 1024):
+    """Compare cracking an unknown shift by brute force against counting
+    letters once, with and without a sample."""
+
+    print("=== Cracking an unknown shift ===")
+    for megabytes in sizes:
+        text = make_english(megabytes)
+        encoded = cipher.caesar_cipher_encode(text, 11)
+
+        (old_shift, old_text), old_seconds = time_it(crack_before, encoded)
+        (new_shift, new_text), new_seconds = time_it(cipher.crack, encoded)
+        (sample_shift, sample_text), sample_seconds = time_it(cipher.crack, encoded, sample_size)
+        assert old_shift == new_shift == sample_shift == 11
+        assert old_text == new_text == sample_text == text
+
+        print(f"{megabytes:>5} MB | brute force {old_seconds:7.3f} s | "
+              f"histogram {new_seconds:7.3f} s | {sample_size // 1024} KB sample {sample_seconds:7.3f} s")
+
+def benchmark_many(count=10_000_000):
+    """Compare records/s for encoding many short messages one call at a
+    time against encode_many(), and for JSON lines records."""
+
+    print(f"=== Encoding {count:,} short messages ===")
+    rng = random.Random(count)
+    words = make_english(1).split()
+    sample = [" ".join(rng.choice(words) for _ in range(rng.randrange(3, 12))) for _ in range(10_000)]
+    sample_shifts = [rng.randrange(26) for _ in sample]
+    expected = [cipher.caesar_cipher_encode(message, 15) for message in sample]
+    assert list(cipher.encode_many(sample, 15)) == expected
+    assert list(cipher.encode_many(sample, sample_shifts)) == [
+        cipher.caesar_cipher_encode(message, shift) for message, shift in zip(sample, sample_shifts)
+    ]
+
+    def messages():
+        # Generated lazily, so 10M messages are never held at once
+        return itertools.islice(itertools.cycle(sample), count)
+
+    def drain(iterable):
+        for _ in iterable:
+            pass
+
+    for label, run in (
+        ("one call each", lambda: drain(cipher.caesar_cipher_encode(message, 15) for message in messages())),
+        ("encode_many", lambda: drain(cipher.encode_many(messages(), 15))),
+        ("per-record shifts", lambda: drain(cipher.encode_many(messages(), itertools.cycle(sample_shifts)))),
+    ):
+        _, seconds = time_it(run)
+        print(f"{label:<18} | {seconds:6.2f} s | {count / seconds:12,.0f} records/s")
+
+    # JSON lines go through json as well, so fewer records are enough
+    lines = count // 10
+    source = io.StringIO("".join(
+        json.dumps({"id": n, "message": message}) + "\n"
+        for n, message in zip(range(lines), itertools.cycle(sample))
+    ))
+    _, seconds = time_it(cipher.encode_jsonl, source, io.StringIO(), 15, "message")
+    print(f"{'JSON lines':<18} | {seconds:6.2f} s | {lines / seconds:12,.0f} records/s")
+
+def import_microseconds(modules, runs=20):
+    """Return the median time in microseconds that python -X importtime
+    reports for importing some modules, over several fresh interpreters."""
+
+    statement = "import " + ", ".join(modules)
+    folder = os.path.dirname(os.path.abspath(cipher.__file__))
+    env = dict(os.environ, PYTHONPATH=folder)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    with tempfile.TemporaryDirectory() as cache:
+        # Keep compiled files out of the repository, and compile them
+        # once first so each run measures a normal, cached import
+        env["PYTHONPYCACHEPREFIX"] = cache
+        subprocess.run([sys.executable, "-c", statement], env=env, check=True)
+
+        totals = []
+        for _ in range(runs):
+            result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                                    env=env, capture_output=True, text=True, check=True)
+            total = 0
+            for line in result.stderr.splitlines():
+                # The cumulative column includes everything the module imported
+                fields = line.split("|")
+                if line.startswith("import time:") and fields[2].strip() in modules:
+                    total += int(fields[1])
+            totals.append(total)
+
+    return sorted(totals)[len(totals) // 2]
+
+def benchmark_import():
+    """Measure how long importing cipher takes, against importing the same
+    modules eagerly at the top as the module used to."""
+
+    print("=== Importing cipher ===")
+    eager = ["argparse", "contextlib", "csv", "functools", "json", "mmap", "stat", "string", "time",
+             "concurrent.futures.process", "multiprocessing.shared_memory"]
+    for label, modules in (("eager imports", eager), ("import cipher", ["cipher"])):
+        print(f"{label:<14} | {import_microseconds(modules):8,} us")
+
+def benchmark_parallel(megabytes=100, max_processes=None):
+    """Measure how encoding a buffer and a file scales from 1 to N cores,
+    checking the output matches the serial encoder byte for byte."""
+
+    max_processes = max_processes or os.cpu_count() or 1
+    print(f"=== Parallel encoding, {megabytes} MB, {os.cpu_count()} cores available ===")
+    data = make_text(megabytes).encode("ascii")
+    expected = cipher.caesar_cipher_encode(data, 15)
+
+    with tempfile.TemporaryDirectory() as folder:
+        input_path = os.path.join(folder, "input.txt")
+        output_path = os.path.join(folder, "output.txt")
+        with open(input_path, "wb") as input_file:
+            input_file.write(data)
+
+        for processes in sorted({1, 2, 4, 8, max_processes}):
+            if processes > max_processes:
+                continue
+
+            encoded, buffer_seconds = time_it(cipher.encode_parallel, data, 15, processes)
+            assert encoded == expected, "parallel output differs"
+
+            _, file_seconds = time_it(cipher.encode_file_parallel, input_path, output_path, 15, processes)
+            with open(output_path, "rb") as output_file:
+                assert output_file.read() == expected, "parallel file output differs"
+
+            print(f"{processes:>3} processes | buffer {megabytes / buffer_seconds:8.1f} MB/s | "
+                  f"file {megabytes / file_seconds:8.1f} MB/s | identical output")
+
+
+if __name__ == "__main__":
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    sizes = tuple(size for size in (1, 10, 100, 1000) if size <= largest)
+    benchmark_encode(sizes)
+    benchmark_stream(sizes)
+    benchmark_crack(tuple(size for size in (1, 4) if size <= largest))
+    benchmark_import()
+    benchmark_many()
+    benchmark_parallel(largest, max_processes=max(2, os.cpu_count() or 1))
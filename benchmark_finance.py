@@ -0,0 +1,278 @@
+"""
+Benchmarks for finance_calculators.py
+
+Run with:
+    python benchmark_finance.py
+
+Needs NumPy, like the batch calculators themselves.
+"""
+
+#=====importing libraries===========
+import csv
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import finance_calculators
+
+
+# === Helper Functions ===
+def make_loans(count, seed=0):
+    """Return (P, annual_rate, n) arrays for count random 30 year mortgages."""
+
+    rng = np.random.default_rng(seed)
+    P = rng.uniform(50_000, 2_000_000, count).round(2)
+    annual_rate = rng.uniform(2, 15, count).round(2)
+    n = np.full(count, 360, dtype=np.int64)
+    return P, annual_rate, n
+
+def write_investment_file(path, count, seed=0):
+    """Write a CSV file of count random investments."""
+
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8") as investment_file:
+        investment_file.write("deposit,interest_rate,years,interest\n")
+        for start in range(0, count, 100_000):
+            size = min(100_000, count - start)
+            deposits = rng.uniform(100, 1_000_000, size).round(2).tolist()
+            rates = rng.uniform(0, 20, size).round(2).tolist()
+            years = rng.integers(1, 41, size).tolist()
+            kinds = np.where(rng.random(size) < 0.5, "simple", "compound").tolist()
+            investment_file.write("".join(
+                f"{d},{r},{t},{k}\n" for d, r, t, k in zip(deposits, rates, years, kinds)
+            ))
+
+def time_it(function, *args):
+    """Return (result, seconds) for a function call."""
+
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+# === Benchmarks ===
+def schedules_before(P, annual_rate, n):
+    """Work out every schedule one loan and one month at a time."""
+
+    return [list(finance_calculators.amortization_schedule(*loan)) for loan in zip(P, annual_rate, n)]
+
+def schedules_after(P, annual_rate, n, chunk_size=finance_calculators.LOANS_PER_CHUNK):
+    """Work out every schedule with the NumPy engine, a chunk at a time."""
+
+    for start in range(0, len(P), chunk_size):
+        end = start + chunk_size
+        finance_calculators.amortization_schedules(P[start:end], annual_rate[start:end], n[start:end])
+
+def benchmark_schedules(counts=(1_000, 10_000, 100_000), loop_limit=10_000):
+    """Compare loans/s for full 30 year amortization schedules between a
+    per-loan Python loop and the vectorized engine, and when writing them
+    out as CSV."""
+
+    print("=== 30 year amortization schedules ===")
+
+    # Both ways give the same numbers
+    P, annual_rate, n = make_loans(100)
+    before = schedules_before(P, annual_rate, n)
+    payment, interest, principal, balance = finance_calculators.amortization_schedules(P, annual_rate, n)
+    for loan, rows in enumerate(before):
+        rows = np.array(rows)
+        assert np.allclose(rows[:, 2], interest[loan]) and np.allclose(rows[:, 3], principal[loan])
+        assert np.allclose(rows[:, 4], balance[loan], atol=1e-4)
+
+    for count in counts:
+        P, annual_rate, n = make_loans(count)
+        line = f"{count:>8} loans"
+
+        if count <= loop_limit:
+            _, seconds = time_it(schedules_before, P, annual_rate, n)
+            line += f" | loop {count / seconds:10,.0f} loans/s"
+
+        _, seconds = time_it(schedules_after, P, annual_rate, n)
+        line += f" | vectorized {count / seconds:10,.0f} loans/s"
+
+        if count <= loop_limit:
+            with open(os.devnull, "w") as output:
+                _, seconds = time_it(finance_calculators.write_schedules, output, P, annual_rate, n)
+            line += f" | written as CSV {count / seconds:8,.0f} loans/s"
+        print(line)
+
+
+def investments_before(source, output):
+    """Work out each investment one row at a time, like the calculator."""
+
+    reader = csv.reader(source)
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(next(reader) + ["total_amount"])
+    rows = 0
+    for row in reader:
+        P, r, t = float(row[0]), float(row[1]) / 100, int(row[2])
+        if row[3].strip().lower() == "compound":
+            total_amount = P * math.pow((1 + r), t)
+        else:
+            total_amount = P * (1 + r * t)
+        writer.writerow(row + [f"{total_amount:.2f}"])
+        rows += 1
+    return rows
+
+def benchmark_investments(counts=(100_000, 1_000_000, 5_000_000)):
+    """Compare rows/s and peak memory for a CSV file of investments, one
+    row at a time against the chunked, vectorized batch mode."""
+
+    print("=== Batch investments from CSV ===")
+    with tempfile.TemporaryDirectory() as folder:
+        input_path = os.path.join(folder, "investments.csv")
+        before_path = os.path.join(folder, "before.csv")
+        after_path = os.path.join(folder, "after.csv")
+
+        for count in counts:
+            write_investment_file(input_path, count)
+
+            for label, run, output_path in (
+                ("row by row", investments_before, before_path),
+                ("vectorized", finance_calculators.write_investments, after_path),
+            ):
+                with open(input_path, encoding="utf-8") as source, open(output_path, "w", encoding="utf-8") as output:
+                    _, seconds = time_it(run, source, output)
+
+                # Memory is measured on a second run, as tracemalloc slows it down
+                with open(input_path, encoding="utf-8") as source, open(os.devnull, "w") as output:
+                    tracemalloc.start()
+                    run(source, output)
+                    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+                    tracemalloc.stop()
+                print(f"{count:>9} rows | {label:<10} | {count / seconds:10,.0f} rows/s | peak memory {peak:6.1f} MB")
+
+            # Same totals to the cent, apart from the odd rounding tie
+            with open(before_path, encoding="utf-8") as before, open(after_path, encoding="utf-8") as after:
+                differences = sum(line_before != line_after for line_before, line_after in zip(before, after))
+            assert differences <= count // 1000, f"{differences} rows differ"
+
+
+def sweep_before(rates, terms, amounts):
+    """Work out every cell of a compound interest grid one at a time."""
+
+    return [[[P * math.pow((1 + r / 100), t) for P in amounts] for t in terms] for r in rates]
+
+def benchmark_sweep(rates=200, terms=360, amounts=1000, big_amounts=20_000):
+    """Measure grid cells/s for a scenario sweep, against a Python loop,
+    with and without the cached factors, and summarised without holding
+    the grid in memory."""
+
+    print("=== Scenario sweeps ===")
+    rate_values = np.linspace(0.5, 20, rates)
+    term_values = np.arange(1, terms + 1)
+    amount_values = np.linspace(1_000, 1_000_000, amounts)
+    cells = rates * terms * amounts
+
+    # The loop is too slow for the whole grid, so it gets a slice of it
+    few_amounts = amount_values[:10]
+    loop, seconds = time_it(sweep_before, rate_values, term_values, few_amounts)
+    grid = finance_calculators.sweep("compound", rate_values, term_values, few_amounts)
+    assert np.allclose(np.array(loop), grid)
+    print(f"{'python loop':<20} | {rates * terms * len(few_amounts):>13,} cells | {rates * terms * len(few_amounts) / seconds:14,.0f} cells/s")
+
+    for kind in finance_calculators.SWEEP_KINDS:
+        finance_calculators.cached_factors.cache_clear()
+        _, cold = time_it(finance_calculators.sweep, kind, rate_values, term_values, amount_values)
+        _, warm = time_it(finance_calculators.sweep, kind, rate_values, term_values, amount_values)
+        print(f"{kind + ' grid':<20} | {cells:>13,} cells | {cells / cold:14,.0f} cells/s | "
+              f"cached factors {cells / warm:14,.0f} cells/s")
+
+    # A grid of rates x months x amounts too big to hold in memory at once
+    big_cells = rates * terms * big_amounts
+    amount_values = np.linspace(1_000, 1_000_000, big_amounts)
+    tracemalloc.start()
+    _, seconds = time_it(finance_calculators.sweep_summary, "bond", rate_values, term_values, amount_values)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    print(f"{'bond summary':<20} | {big_cells:>13,} cells | {big_cells / seconds:14,.0f} cells/s | "
+          f"peak memory {peak:6.1f} MB for a {big_cells * 8 / 1024 ** 3:.1f} GB grid")
+
+
+def monte_carlo_before(P, rate, volatility, t, paths, seed=0):
+    """Simulate each path one year at a time in Python."""
+
+    rng = random.Random(seed)
+    final_amounts = []
+    for _ in range(paths):
+        total_amount = P
+        for _ in range(t):
+            total_amount *= 1 + rng.gauss(rate / 100, volatility / 100)
+        final_amounts.append(total_amount)
+    return final_amounts
+
+def benchmark_monte_carlo(paths=1_000_000, years=40, loop_paths=20_000):
+    """Measure paths/s for Monte Carlo simulations of 40 years of random
+    returns, against a Python loop, and across processes."""
+
+    print(f"=== Monte Carlo, {years} years, {os.cpu_count()} cores available ===")
+    _, seconds = time_it(monte_carlo_before, 10_000, 7, 15, years, loop_paths)
+    print(f"{'python loop':<26} | {loop_paths:>9,} paths | {loop_paths / seconds:12,.0f} paths/s")
+
+    # The same seed gives the same paths however many processes there are
+    first = finance_calculators.simulate_returns(10_000, 7, 15, years, 250_000, seed=1)
+    second = finance_calculators.simulate_returns(10_000, 7, 15, years, 250_000, seed=1, processes=2)
+    assert np.array_equal(first, second)
+
+    for distribution in finance_calculators.DISTRIBUTIONS:
+        for processes in sorted({1, 2, os.cpu_count() or 1}):
+            _, seconds = time_it(lambda: finance_calculators.monte_carlo_percentiles(
+                10_000, 7, 15, years, paths=paths, distribution=distribution, seed=1, processes=processes
+            ))
+            label = f"{distribution}, {processes} process{'es' if processes > 1 else ''}"
+            print(f"{label:<26} | {paths:>9,} paths | {paths / seconds:12,.0f} paths/s")
+
+
+def calls_per_second(function, arguments, seconds=0.5):
+    """Call function(*args) over a list of argument tuples repeatedly for
+    about the given time, return calls/s."""
+
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for args in arguments:
+            function(*args)
+        calls += len(arguments)
+    return calls / (time.perf_counter() - start)
+
+def benchmark_modes(count=1_000, vector_size=1_000_000):
+    """Compare the float, decimal and vectorized paths of the calculator
+    functions, and how often float and decimal differ by a cent."""
+
+    print("=== Calculator modes ===")
+    rng = random.Random(0)
+    investments = [(round(rng.uniform(100, 1_000_000), 2), round(rng.uniform(0.5, 20), 2), rng.randrange(1, 41))
+                   for _ in range(count)]
+    bonds = [(round(rng.uniform(50_000, 2_000_000), 2), round(rng.uniform(0.5, 20), 2), rng.choice((120, 240, 360)))
+             for _ in range(count)]
+
+    for name, function, arguments in (
+        ("simple_interest", finance_calculators.simple_interest, investments),
+        ("compound_interest", finance_calculators.compound_interest, investments),
+        ("bond_repayment", finance_calculators.bond_repayment, bonds),
+    ):
+        floats = calls_per_second(function, arguments)
+        exact = calls_per_second(lambda *args: function(*args, exact=True), arguments)
+
+        columns = [np.resize(np.array(column, dtype=float), vector_size) for column in zip(*arguments)]
+        _, seconds = time_it(function, *columns)
+
+        # How often rounding the float result gives a different cent
+        differences = sum(
+            f"{function(*args):.2f}" != str(function(*args, exact=True)) for args in arguments
+        )
+        print(f"{name:<17} | float {floats:10,.0f} calls/s | decimal {exact:9,.0f} calls/s | "
+              f"vectorized {vector_size / seconds:12,.0f} values/s | {differences} of {count} differ by a cent")
+
+
+if __name__ == "__main__":
+    benchmark_modes()
+    benchmark_schedules()
+    benchmark_investments()
+    benchmark_sweep()
+    benchmark_monte_carlo()
@@ -0,0 +1,360 @@
+"""
+Benchmarks for inventory.py
+
+Run with:
+    python benchmark_inventory.py
+"""
+
+#=====importing libraries===========
+import contextlib
+import heapq
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import inventory
+
+
+# === Helper Functions ===
+def make_store(count, seed=0):
+    """Return a ShoeStore with count random shoes."""
+
+    rng = random.Random(seed)
+    countries = ["South Africa", "China", "Vietnam", "Indonesia", "Brazil", "USA", "India", "Pakistan"]
+    store = inventory.ShoeStore()
+    for n in range(count):
+        store.add(inventory.Shoe(rng.choice(countries), f"SKU{n:08d}", f"Product {n}",
+                                 float(rng.randrange(100, 5000)), rng.randrange(0, 500)))
+    return store
+
+def make_lines(count, seed=0):
+    """Return count inventory.txt style lines."""
+
+    rng = random.Random(seed)
+    countries = ["South Africa", "China", "Vietnam", "Indonesia", "Brazil", "USA", "India", "Pakistan"]
+    return [f"{rng.choice(countries)},SKU{n:08d},Product {n},{rng.randrange(100, 5000)},{rng.randrange(0, 500)}"
+            for n in range(count)]
+
+def write_inventory_file(path, count, seed=0):
+    """Write an inventory.txt style file with count rows, about 1 in 1000
+    of them bad, and some quoted product names with commas."""
+
+    rng = random.Random(seed)
+    countries = ["South Africa", "China", "Vietnam", "Indonesia", "Brazil", "USA", "India", "Pakistan"]
+    with open(path, "w", encoding="utf-8") as inventory_file:
+        inventory_file.write("Country,Code,Product,Cost,Quantity\n")
+        for start in range(0, count, 100_000):
+            lines = []
+            for n in range(start, min(start + 100_000, count)):
+                if rng.random() < 0.001:
+                    lines.append(f"Nowhere,SKU{n:08d},Broken row,not a number,1")
+                    continue
+                product = f'"Product {n}, size {rng.randrange(3, 13)}"' if n % 10 == 0 else f"Product {n}"
+                lines.append(f"{rng.choice(countries)},SKU{n:08d},{product},"
+                             f"{rng.randrange(100, 5000)},{rng.randrange(0, 500)}")
+            inventory_file.write("\n".join(lines) + "\n")
+
+def time_it(function, *args):
+    """Return (result, seconds) for a function call."""
+
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+# === Benchmarks ===
+class ShoeBefore:
+    """The original Shoe, with a dictionary for its attributes."""
+
+    def __init__(self, country, code, product, cost, quantity):
+        self.country = country
+        self.code = code
+        self.product = product
+        self.cost = cost
+        self.quantity = quantity
+
+def search_before(shoe_list, code):
+    """The original search: go through the list until the code matches."""
+
+    for shoe in shoe_list:
+        if shoe.code == code:
+            return shoe
+    return None
+
+def benchmark_lookups(sizes=(1_000, 100_000, 500_000), lookups=100_000, scan_lookups=200):
+    """Compare lookups/s by shoe code for a list scan, the dictionary
+    index, and batch lookups."""
+
+    print("=== Looking shoes up by code ===")
+    for count in sizes:
+        store = make_store(count)
+        rng = random.Random(count)
+        codes = [f"SKU{rng.randrange(count * 2):08d}" for _ in range(lookups)]  # About half are missing
+
+        scan_codes = codes[:scan_lookups]
+        found_before, seconds = time_it(lambda: [search_before(store.shoes, code) for code in scan_codes])
+        scan_rate = len(scan_codes) / seconds
+
+        found_after, seconds = time_it(lambda: [store.find(code) for code in codes])
+        assert found_after[:scan_lookups] == found_before
+        find_rate = lookups / seconds
+
+        found_batch, seconds = time_it(store.find_many, codes)
+        assert found_batch == found_after
+        batch_rate = lookups / seconds
+
+        print(f"{count:>8} shoes | scan {scan_rate:12,.0f} lookups/s | find {find_rate:12,.0f} lookups/s | "
+              f"find_many {batch_rate:12,.0f} lookups/s")
+
+
+def benchmark_restock(sizes=(1_000, 100_000, 500_000), restocks=1_000, k=100):
+    """Compare a restocking session, which finds the lowest stock shoe and
+    restocks it again and again, using min() against the quantity heaps.
+    Also compares bottom-k and top-k queries."""
+
+    print(f"=== Restocking {restocks} times, and {k} lowest / highest ===")
+    for count in sizes:
+        before = make_store(count)
+        after = make_store(count)
+
+        def session_before():
+            picked = []
+            for _ in range(restocks):
+                shoe = min(before.shoes, key=lambda s: s.quantity)
+                shoe.quantity += 500
+                picked.append(shoe.code)
+            return picked
+
+        def session_after():
+            picked = []
+            for _ in range(restocks):
+                shoe = after.lowest()[0]
+                after.restock(shoe, 500)
+                picked.append(shoe.code)
+            return picked
+
+        picked_before, before_seconds = time_it(session_before)
+        picked_after, after_seconds = time_it(session_after)
+        assert picked_before == picked_after
+
+        lowest_before, scan_seconds = time_it(heapq.nsmallest, k, before.shoes, lambda s: s.quantity)
+        lowest_after, heap_seconds = time_it(after.lowest, k)
+        assert [s.code for s in lowest_before] == [s.code for s in lowest_after]
+        highest_before = heapq.nlargest(k, before.shoes, lambda s: s.quantity)
+        highest_after, top_seconds = time_it(after.highest, k)
+        assert [s.quantity for s in highest_before] == [s.quantity for s in highest_after]
+
+        print(f"{count:>8} shoes | min() {restocks / before_seconds:10,.0f} restocks/s | "
+              f"heap {restocks / after_seconds:10,.0f} restocks/s | "
+              f"bottom-{k} nsmallest {scan_seconds * 1000:8.2f} ms, heap {heap_seconds * 1000:6.2f} ms | "
+              f"top-{k} heap {top_seconds * 1000:6.2f} ms")
+
+
+def load_shoes(shoe_class, lines):
+    """Parse lines into a list of shoes, as read_shoes_data() does."""
+
+    shoes = []
+    for line in lines:
+        country, code, product, cost, quantity = line.split(",")
+        shoes.append(shoe_class(country, code, product, float(cost), int(quantity)))
+    return shoes
+
+def benchmark_memory(sizes=(100_000, 1_000_000)):
+    """Compare memory per SKU and the speed of totals between the original
+    Shoe objects and the __slots__ ones with shared country names."""
+
+    print("=== Memory per SKU and totals ===")
+    for count in sizes:
+        lines = make_lines(count)
+
+        for label, shoe_class in (("before", ShoeBefore), ("after", inventory.Shoe)):
+            tracemalloc.start()
+            shoes = load_shoes(shoe_class, lines)
+            held = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            _, seconds = time_it(lambda: sum(shoe.cost * shoe.quantity for shoe in shoes))
+            print(f"{count:>9} shoes | {label:<6} | {held / count:6.0f} bytes/SKU | "
+                  f"total value {count / seconds / 1e6:6.1f} M shoes/s")
+            del shoes
+
+        # The whole store, with the code index and quantity heaps too
+        tracemalloc.start()
+        store = inventory.ShoeStore()
+        for shoe in load_shoes(inventory.Shoe, lines):
+            store.add(shoe)
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        _, seconds = time_it(store.total_value)
+        print(f"{count:>9} shoes | store  | {held / count:6.0f} bytes/SKU | "
+              f"total value {count / seconds / 1e6:6.1f} M shoes/s")
+        del store
+
+
+def read_shoes_data_before(path):
+    """The original loader: split every line on commas and print an
+    error for each bad one."""
+
+    shoes = []
+    with open(path, "r") as f:
+        next(f)
+        for line in f:
+            try:
+                country, code, product, cost, quantity = line.strip().split(",")
+                shoes.append(ShoeBefore(country, code, product, float(cost), int(quantity)))
+            except ValueError:
+                print(f"Error reading line: {line.strip()}")
+    return shoes
+
+def read_shoes_data_split(path):
+    """The split(",") loader adding to a ShoeStore one line at a time, as
+    read_shoes_data() did before the csv loader."""
+
+    shoe_store = inventory.ShoeStore()
+    with open(path, "r") as f:
+        next(f)
+        for line in f:
+            try:
+                country, code, product, cost, quantity = line.strip().split(",")
+                shoe = inventory.Shoe(country, code, product, float(cost), int(quantity))
+                if shoe_store.find(code) is not None:
+                    print(f"Duplicate shoe code {code}, skipping line: {line.strip()}")
+                    continue
+                shoe_store.add(shoe)
+            except ValueError:
+                print(f"Error reading line: {line.strip()}")
+    return shoe_store
+
+def load_in_subprocess(loader, path):
+    """Run one loader in a fresh Python, return (seconds, peak MB, shoes)."""
+
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--load", loader, path],
+                            capture_output=True, text=True, check=True)
+    seconds, peak, shoes = result.stdout.split()
+    return float(seconds), float(peak), int(shoes)
+
+def run_loader(loader, path):
+    """Load a file with one loader and print the time, peak memory and
+    number of shoes, for load_in_subprocess()."""
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if loader == "original":
+            shoes, seconds = time_it(read_shoes_data_before, path)
+            count = len(shoes)
+        elif loader == "split":
+            shoe_store, seconds = time_it(read_shoes_data_split, path)
+            count = len(shoe_store)
+        else:
+            report, seconds = time_it(inventory.load_inventory, path)
+            count = len(inventory.store)
+
+    print(seconds, peak_megabytes(), count)
+
+def peak_megabytes():
+    """Return the most memory this process has used, in MB."""
+
+    # ru_maxrss carries over from the parent process on Linux, the high
+    # water mark in /proc doesn't
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def benchmark_load(sizes=(100_000, 1_000_000, 5_000_000)):
+    """Compare load time and peak memory, each in a fresh process, of the
+    original split(",") loader into a plain list, the same loader into a
+    ShoeStore, and the csv streaming loader."""
+
+    print("=== Loading inventory.txt ===")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "inventory.txt")
+        for count in sizes:
+            write_inventory_file(path, count)
+            for loader in ("original", "split", "csv"):
+                seconds, peak, shoes = load_in_subprocess(loader, path)
+                print(f"{count:>9} rows | {loader:<8} | {seconds:6.2f} s | {count / seconds:9,.0f} rows/s | "
+                      f"peak memory {peak:7.1f} MB | {shoes:>9} shoes")
+
+            # The original loader also loses every product name with a
+            # comma in it, as they split into too many fields
+            report = inventory.load_inventory(path, inventory.ShoeStore())
+            assert report.loaded == shoes and sum(report.rejected.values()) == count - shoes
+
+
+def update_inventory_file_before(path, shoes):
+    """The original save: write every shoe out again, straight over the file."""
+
+    with open(path, "w") as f:
+        f.write("Country,Code,Product,Cost,Quantity\n")
+        for s in shoes:
+            f.write(f"{s.country},{s.code},{s.product},{s.cost},{s.quantity}\n")
+
+def benchmark_persistence(sizes=(100_000, 1_000_000), rewrites=5, restocks=100_000, flushes=200):
+    """Compare restocks/s when every restock rewrites inventory.txt, against
+    the write-behind journal, and time a single restock saved on its own."""
+
+    print("=== Saving restocks ===")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "inventory.txt")
+        for count in sizes:
+            rng = random.Random(count)
+            shoe_store = make_store(count)
+            inventory.update_inventory_file(path, shoe_store)
+            codes = [f"SKU{rng.randrange(count):08d}" for _ in range(restocks)]
+
+            def session_before():
+                for code in codes[:rewrites]:
+                    shoe_store.restock(shoe_store.find(code), 1)
+                    update_inventory_file_before(path, shoe_store.shoes)
+
+            _, seconds = time_it(session_before)
+            before_rate = rewrites / seconds
+
+            shoe_store.take_changes()
+            saver = inventory.InventoryFile(shoe_store, path)
+
+            def session_after():
+                for code in codes:
+                    shoe_store.restock(shoe_store.find(code), 1)
+                    saver.changed()
+                saver.flush()
+
+            _, seconds = time_it(session_after)
+            after_rate = restocks / seconds
+
+            # One restock at a time, each saved straight away with its own fsync
+            def single_flushes():
+                for code in codes[:flushes]:
+                    shoe_store.restock(shoe_store.find(code), 1)
+                    saver.flush()
+
+            _, seconds = time_it(single_flushes)
+            single_ms = seconds / flushes * 1000
+
+            _, close_seconds = time_it(saver.close)
+
+            # The saved file loads back to the same quantities
+            loaded = inventory.ShoeStore()
+            inventory.InventoryFile(loaded, path).load()
+            assert [shoe.quantity for shoe in loaded.shoes] == [shoe.quantity for shoe in shoe_store.shoes]
+
+            print(f"{count:>9} shoes | rewrite every restock {before_rate:8,.1f} restocks/s | "
+                  f"write-behind {after_rate:10,.0f} restocks/s | one restock saved {single_ms:6.2f} ms | "
+                  f"compact on close {close_seconds:5.2f} s")
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--load"]:
+    run_loader(sys.argv[2], sys.argv[3])
+elif __name__ == "__main__":
+    benchmark_lookups()
+    benchmark_restock()
+    benchmark_memory()
+    benchmark_load()
+    benchmark_persistence()
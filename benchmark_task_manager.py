@@ -0,0 +1,439 @@
+"""
+Benchmarks for task_manager.py
+
+Run with:
+    python benchmark_task_manager.py
+
+Each benchmark works on generated files in a temporary folder, so it never
+touches the real user.txt or tasks.txt.
+"""
+
+#=====importing libraries===========
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import task_manager
+
+DATETIME_STRING_FORMAT = "%Y-%m-%d"
+
+
+# === Helper Functions ===
+def write_task_file(path, count):
+    """Write a tasks.txt style file with count random tasks."""
+
+    rng = random.Random(count)
+    start = date(2024, 1, 1)
+    users = [f"user{n}" for n in range(100)]
+
+    with open(path, "w", encoding="utf-8") as task_file:
+        lines = []
+        for n in range(count):
+            due_date = start + timedelta(days=rng.randrange(1000))
+            assigned_date = start + timedelta(days=rng.randrange(365))
+            lines.append(
+                f"{rng.choice(users)};Task {n};Description of task {n};"
+                f"{due_date.isoformat()};{assigned_date.isoformat()};"
+                f"{'Yes' if rng.random() < 0.3 else 'No'}"
+            )
+        task_file.write("\n".join(lines))
+
+def write_user_file(path, count):
+    """Write a user.txt style file with admin plus count users."""
+
+    with open(path, "w", encoding="utf-8") as user_file:
+        user_file.write("\n".join(["admin;password"] + [f"user{n};password{n}" for n in range(count)]))
+
+def free_port():
+    """Ask the operating system for a port nobody is using."""
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def percentile(values, percent):
+    """Return the given percentile of a list of numbers."""
+
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+def measure(load, path):
+    """Return (seconds, megabytes held) for a loader."""
+
+    start = time.perf_counter()
+    result = load(path)
+    seconds = time.perf_counter() - start
+    del result
+
+    # Memory is measured on a second run, as tracemalloc slows loading down
+    tracemalloc.start()
+    result = load(path)
+    megabytes = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    del result
+
+    return seconds, megabytes
+
+
+# === Loaders ===
+def load_tasks_before(path):
+    """The original loader: read the whole file, strptime every date and
+    keep each task as a dictionary."""
+
+    with open(path, 'r', encoding="utf-8") as task_file:
+        task_data = task_file.read().split("\n")
+        task_data = [task for task in task_data if task != ""]
+
+    task_list = []
+    for task in task_data:
+        task_components = task.split(";")
+        task_list.append({
+            "username": task_components[0],
+            "title": task_components[1],
+            "description": task_components[2],
+            "due_date": datetime.strptime(task_components[3], DATETIME_STRING_FORMAT),
+            "assigned_date": datetime.strptime(task_components[4], DATETIME_STRING_FORMAT),
+            "completed": task_components[5] == "Yes"
+        })
+    return task_list
+
+def load_tasks_after(path):
+    """The streaming loader into an indexed TaskStore."""
+
+    store = task_manager.TaskStore()
+    task_manager.load_tasks(path, store)
+    return store
+
+
+# === Benchmarks ===
+def benchmark_load(sizes=(100_000, 1_000_000)):
+    """Compare startup time and memory of the old and new task loaders."""
+
+    print("=== Loading tasks.txt ===")
+    with tempfile.TemporaryDirectory() as folder:
+        for count in sizes:
+            path = os.path.join(folder, f"tasks_{count}.txt")
+            write_task_file(path, count)
+
+            for name, load in (("before", load_tasks_before), ("after", load_tasks_after)):
+                seconds, megabytes = measure(load, path)
+                print(f"{count:>9} tasks | {name:<6} | {seconds:7.2f} s | "
+                      f"{megabytes:8.1f} MB | {megabytes * 1024 * 1024 / count:6.0f} bytes/task")
+
+
+def logins_per_second(check, seconds=1.0):
+    """Call check() repeatedly for about the given time, return calls/s."""
+
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        check()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+def benchmark_login():
+    """Compare login checks per second for different password hash costs,
+    and with the task server's login cache."""
+
+    print("=== Login checks ===")
+    settings = [
+        ("pbkdf2_sha256", "100000"),
+        ("pbkdf2_sha256", "600000"),
+        ("scrypt", "4096:8:1"),
+        ("scrypt", "16384:8:1"),
+        ("scrypt", "65536:8:1"),
+    ]
+    for kdf, cost in settings:
+        stored_password = task_manager.hash_password("password", kdf, cost)
+        rate = logins_per_second(lambda: task_manager.verify_password("password", stored_password))
+        print(f"{kdf:<14} {cost:>10} | {rate:10.1f} logins/s")
+
+    # The same default settings, with and without the login cache
+    with tempfile.TemporaryDirectory() as folder:
+        storage = task_manager.TextStorage(
+            os.path.join(folder, "user.txt"),
+            os.path.join(folder, "tasks.txt"),
+            os.path.join(folder, "tasks_journal.txt")
+        )
+        uncached = logins_per_second(lambda: storage.check_login("admin", "password"))
+
+        # A cached login, checked the way TaskServer.login() does
+        login_cache = task_manager.LoginCache()
+        login_cache.remember("admin", storage.get_password_hash("admin"), "password")
+
+        def cached_login():
+            assert login_cache.is_cached("admin", storage.get_password_hash("admin"), "password")
+
+        cached = logins_per_second(cached_login)
+        print(f"{'default':<14} {'uncached':>10} | {uncached:10.1f} logins/s")
+        print(f"{'default':<14} {'cached':>10} | {cached:10.1f} logins/s")
+
+def fresh_text_storage(folder):
+    """Open a TextStorage on new files in a folder."""
+
+    for name in ("user.txt", "tasks.txt", "tasks_journal.txt"):
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            os.remove(path)
+    return task_manager.TextStorage(
+        os.path.join(folder, "user.txt"),
+        os.path.join(folder, "tasks.txt"),
+        os.path.join(folder, "tasks_journal.txt")
+    )
+
+def benchmark_register(count=100_000, rewrite_count=5_000, full_cost_count=1_000, upgrade_count=200):
+    """Compare registering users one by one with rewriting user.txt every
+    time, against the bulk register_users() import, and saving upgraded
+    password hashes by rewriting user.txt against appending them."""
+
+    print("=== Registering users ===")
+    cheap = ("pbkdf2_sha256", "1000")
+    with tempfile.TemporaryDirectory() as folder:
+        # Before: every new user rewrote the whole of user.txt
+        storage = fresh_text_storage(folder)
+        start = time.perf_counter()
+        for n in range(rewrite_count):
+            storage.username_password[f"user{n}"] = task_manager.hash_password("password", *cheap)
+            storage.write_users()
+        seconds = time.perf_counter() - start
+        print(f"rewrite per user | {rewrite_count:>7} users | {seconds:7.2f} s | {rewrite_count / seconds:9.0f} users/s")
+
+        # After: appending one user at a time
+        storage = fresh_text_storage(folder)
+        start = time.perf_counter()
+        for n in range(rewrite_count):
+            storage.add_user_hashes([(f"user{n}", task_manager.hash_password("password", *cheap))])
+        seconds = time.perf_counter() - start
+        print(f"append per user  | {rewrite_count:>7} users | {seconds:7.2f} s | {rewrite_count / seconds:9.0f} users/s")
+
+        # After: bulk import, with cheap hashes to show the I/O cost and
+        # with the default settings to show the hashing cost
+        for label, users, kdf, cost in (
+            ("bulk, cheap hash", count, *cheap),
+            ("bulk, full hash", full_cost_count, task_manager.PASSWORD_KDF, None),
+        ):
+            storage = fresh_text_storage(folder)
+            rows = ((f"user{n}", f"password{n}") for n in range(users))
+            start = time.perf_counter()
+            added, rejected = task_manager.register_users(storage, rows, kdf=kdf, cost=cost)
+            seconds = time.perf_counter() - start
+            print(f"{label:<16} | {added:>7} users | {seconds:7.2f} s | {added / seconds:9.0f} users/s")
+
+        # First logins after a cheap import, each saving an upgraded hash.
+        # The hashing is left out to show the cost of saving.
+        storage = fresh_text_storage(folder)
+        cheap_hash = task_manager.hash_password("password", *cheap)
+        storage.add_user_hashes((f"user{n}", cheap_hash) for n in range(count))
+        upgraded_hash = task_manager.hash_password("password")
+
+        start = time.perf_counter()
+        for n in range(upgrade_count):
+            storage.username_password[f"user{n}"] = upgraded_hash
+            storage.write_users()
+        seconds = time.perf_counter() - start
+        print(f"upgrade, rewrite | {upgrade_count:>7} users | {seconds:7.2f} s | {upgrade_count / seconds:9.0f} users/s")
+
+        start = time.perf_counter()
+        for n in range(count):
+            storage.set_password_hashes({f"user{n}": upgraded_hash})
+        seconds = time.perf_counter() - start
+        print(f"upgrade, append  | {count:>7} users | {seconds:7.2f} s | {count / seconds:9.0f} users/s")
+
+        # Reloading gives every user their latest hash
+        storage = task_manager.TextStorage(
+            os.path.join(folder, "user.txt"),
+            os.path.join(folder, "tasks.txt"),
+            os.path.join(folder, "tasks_journal.txt")
+        )
+        assert {password_hash for username, password_hash in storage.users() if username != "admin"} == {upgraded_hash}
+        assert storage.user_count() == count + 1
+
+def recount(tasks, today):
+    """Work out the report counts the slow way, by looking at every task."""
+
+    totals = [0, 0, 0]
+    per_user = {}
+    for task in tasks:
+        user_counts = per_user.setdefault(task.username, [0, 0, 0])
+        for counts in (totals, user_counts):
+            counts[0] += 1
+            if task.completed:
+                counts[1] += 1
+            elif task.due_date < today:
+                counts[2] += 1
+    return tuple(totals), {username: tuple(counts) for username, counts in per_user.items()}
+
+def check_counts(storage, today):
+    """Check the storage's report counts against a full recount."""
+
+    totals, per_user = storage.report_counts(today)
+    # Users whose tasks were all reassigned keep an entry of zeros
+    per_user = {username: counts for username, counts in per_user.items() if counts != (0, 0, 0)}
+    assert (totals, per_user) == recount(storage.all_tasks(), today), f"report counts are wrong for {today}"
+
+def check_journal_replay(changes=2_500, seed=0):
+    """Make random changes through a TextStorage, checking the report
+    counts against a full recount as the days go by. Then check that
+    after a crash the journal replays to the same tasks, that a record cut
+    off by the crash is ignored, even when it is all the journal holds,
+    and that replaying the journal a second time, as after a crash between
+    compacting and clearing it, changes nothing."""
+
+    print("=== Checking the journal replay and report counts ===")
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    users = [f"user{n}" for n in range(20)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        storage = fresh_text_storage(folder)
+        for n in range(changes):
+            choice = rng.random()
+            task_count = len(storage.tasks)
+            if choice < 0.4 or task_count == 0:
+                storage.add_task(task_manager.Task(
+                    rng.choice(users), f"Task {n}", "Checked against a recount",
+                    start + timedelta(days=rng.randrange(60)), start, rng.random() < 0.2
+                ))
+            elif choice < 0.6:
+                storage.complete_task(rng.randrange(task_count))
+            elif choice < 0.8:
+                storage.reassign_task(rng.randrange(task_count), rng.choice(users))
+            else:
+                storage.redate_task(rng.randrange(task_count), start + timedelta(days=rng.randrange(60)))
+
+            # Days mostly move forward, and now and then go backwards
+            if n % 50 == 0:
+                check_counts(storage, start + timedelta(days=rng.randrange(70)))
+
+        # Crash: nothing is closed, the journal still holds the latest
+        # changes, and the last record was only half written
+        expected = [task_manager.task_to_line(task) for task in storage.all_tasks()]
+        assert storage.journal_records > 0
+        journal_file = os.path.join(folder, "tasks_journal.txt")
+        open_task = next(task_id for task_id, task in enumerate(storage.all_tasks()) if not task.completed)
+        with open(journal_file, "a", encoding="utf-8") as journal:
+            journal.write(f"complete;{open_task}")
+        with open(journal_file, "r", encoding="utf-8") as journal:
+            journal_copy = journal.read()
+
+        paths = (os.path.join(folder, "user.txt"), os.path.join(folder, "tasks.txt"), journal_file)
+        for attempt in ("replay", "replay again"):
+            storage = task_manager.TextStorage(*paths)
+            assert [task_manager.task_to_line(task) for task in storage.all_tasks()] == expected, attempt
+            assert os.path.getsize(journal_file) == 0, attempt
+            for days in (0, 30, 70, 10):
+                check_counts(storage, start + timedelta(days=days))
+
+            # The journal is put back, as if the crash came after the new
+            # tasks.txt was written but before the journal was cleared
+            with open(journal_file, "w", encoding="utf-8") as journal:
+                journal.write(journal_copy)
+
+        # A crash that leaves nothing in the journal but a cut-off line.
+        # The next change must still go on a line of its own, so it
+        # replays after yet another crash
+        task_manager.TextStorage(*paths)
+        with open(journal_file, "w", encoding="utf-8") as journal:
+            journal.write(f"add;{len(expected)};user0;Cut off")
+        storage = task_manager.TextStorage(*paths)
+        storage.complete_task(open_task)
+        storage = task_manager.TextStorage(*paths)
+        assert len(storage.tasks) == len(expected) and storage.get_task(open_task).completed
+        check_counts(storage, start + timedelta(days=30))
+
+    print(f"{changes} random changes, counts and replay match a full recount")
+
+async def simulated_user(port, number, requests, latencies):
+    """Log in as one user and send a mix of requests to the task server."""
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    username = f"user{number}"
+    rng = random.Random(number)
+
+    async def request(op, *args):
+        start = time.perf_counter()
+        writer.write((json.dumps({"op": op, "args": args}) + "\n").encode("utf-8"))
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    await request("login", username, f"password{number}")
+    today = date.today().isoformat()
+    for n in range(requests):
+        choice = rng.random()
+        if choice < 0.6:
+            await request("tasks_for_user", username)
+        elif choice < 0.8:
+            await request("add_task", {
+                "username": username, "title": f"Load test {n}", "description": "Added by the load test",
+                "due_date": today, "assigned_date": today, "completed": False
+            })
+        elif choice < 0.9:
+            my_tasks = await request("tasks_for_user", username)
+            open_tasks = [task["id"] for task in my_tasks if not task["completed"]]
+            if open_tasks:
+                await request("complete_task", rng.choice(open_tasks))
+        else:
+            await request("report_counts", today)
+
+    writer.close()
+    await writer.wait_closed()
+
+async def run_load(port, users, requests):
+    """Run every simulated user at once, return (seconds, latencies)."""
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(simulated_user(port, n, requests, latencies) for n in range(users)))
+    return time.perf_counter() - start, latencies
+
+def benchmark_server(user_counts=(1, 10, 100), requests=200, backend="text"):
+    """Load test the task server with many users sending requests at once."""
+
+    print(f"=== Task server ({backend} backend), {requests} requests per user ===")
+    with tempfile.TemporaryDirectory() as folder:
+        write_user_file(os.path.join(folder, "user.txt"), max(user_counts))
+        write_task_file(os.path.join(folder, "tasks.txt"), 10_000)
+        script = os.path.abspath(task_manager.__file__)
+
+        # Copy the generated text files into the database
+        if backend == "sqlite":
+            subprocess.run([sys.executable, script, "--migrate-to", "sqlite"],
+                           cwd=folder, check=True, stdout=subprocess.DEVNULL)
+
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, script, "--serve", "--backend", backend, "--port", str(port)],
+            cwd=folder, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            server.stdout.readline()  # Wait until the server is listening
+
+            for users in user_counts:
+                seconds, latencies = asyncio.run(run_load(port, users, requests))
+                print(f"{users:>5} users | {len(latencies) / seconds:9.0f} requests/s | "
+                      f"p50 {percentile(latencies, 50) * 1000:7.2f} ms | "
+                      f"p99 {percentile(latencies, 99) * 1000:7.2f} ms")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    check_journal_replay()
+    benchmark_load()
+    benchmark_login()
+    benchmark_register()
+    benchmark_server(backend="text")
+    benchmark_server(backend="sqlite")
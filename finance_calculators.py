@@ -1,44 +1,793 @@
 # Python code:
+#
+# Run with no arguments for the interactive calculator. The calculators can
+# also be used without the questions, or imported as functions:
+#     python finance_calculators.py --investment compound --deposit 1000 --rate 8 --years 10
+#     python finance_calculators.py --bond --present-value 100000 --rate 7.5 --months 360 --exact
+#
+# Full amortization
+# schedules for a CSV file of loans can be worked out in one go with:
+#     python finance_calculators.py --schedules loans.csv --output schedules.csv
+#
+# The loans file has a header row and the columns present_value,
+# annual_rate (without %) and months, the same as the bond questions.
+#
+# A CSV file of investments, with the columns deposit, interest_rate
+# (without %), years and interest ('simple' or 'compound'), gets a
+# total_amount column added with:
+#     python finance_calculators.py --investments deposits.csv --output totals.csv
+#
+# Summary statistics over a grid of rates x terms x amounts, which can be
+# far too big to hold in memory, are printed with:
+#     python finance_calculators.py --sweep compound --rates 1:20:200 --terms 1:30:30 --amounts 1000:1000000:1000
+#
+# Percentiles of the final amount when each year's return is random:
+#     python finance_calculators.py --monte-carlo --deposit 10000 --rate 7 --volatility 15 --years 40 --seed 1
 
 import math
+import sys
+from decimal import ROUND_HALF_UP, Decimal, localcontext
+from functools import lru_cache
+from itertools import islice
+
+# NumPy is only needed for the batch calculations, not the interactive menu
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# How many loans are worked out at once. Each loan takes a row of every
+# month, so this keeps memory use the same however many loans there are
+LOANS_PER_CHUNK = 1000
+
+SCHEDULE_HEADER = "loan,month,payment,interest,principal,balance"
+SCHEDULE_ROW_FORMAT = "%d,%d,%.2f,%.2f,%.2f,%.2f\n"
+
+# How many investment rows are read and worked out at once
+INVESTMENTS_PER_CHUNK = 100_000
+
+INVESTMENT_COLUMNS = ("deposit", "interest_rate", "years", "interest")
+
+# The kinds of calculation a scenario sweep can do
+SWEEP_KINDS = ("simple", "compound", "bond")
+
+# How many grid cells a sweep summary works out at once
+SWEEP_CHUNK_CELLS = 4_000_000
+
+# Monte Carlo paths are simulated this many at a time. Each chunk gets its
+# own random numbers from the seed, so the results are the same however
+# many processes share the chunks
+PATHS_PER_CHUNK = 100_000
+
+DISTRIBUTIONS = ("normal", "lognormal")
+
+# Exact mode works to this many significant digits, then rounds to cents
+EXACT_PRECISION = 40
+CENT = Decimal("0.01")
+
+# Plain numbers take the quick path through the calculator functions
+NUMBER_TYPES = frozenset((int, float))
+
+
+def require_numpy():
+    """Raise a helpful error if NumPy isn't installed."""
+
+    if np is None:
+        raise ImportError("the batch calculators need NumPy, install it with: pip install numpy")
+
+
+def is_array(*values) -> bool:
+    """Return True if any of the values is a list or array, rather than
+    a single number."""
+
+    return any(isinstance(value, (list, tuple)) or hasattr(value, "ndim") for value in values)
+
+
+def to_decimal(value) -> Decimal:
+    """Turn a number into a Decimal, as it would be written down, so 0.1
+    stays exactly 0.1."""
+
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def simple_interest(P, r, t, exact: bool = False):
+    """
+    Work out the total amount of an investment with simple interest.
+
+    Args:
+        P: The amount deposited.
+        r: The interest rate, without %.
+        t: The number of years invested.
+        exact (bool): Work in decimal and round to cents, for figures
+            that must match to the cent.
+
+    Returns:
+        The total amount: a float, a Decimal if exact, or an array if
+        any of the arguments is a list or array.
+    """
+    # Plain floats and ints, the usual case, skip every other check
+    if not exact and type(P) in NUMBER_TYPES and type(r) in NUMBER_TYPES and type(t) in NUMBER_TYPES:
+        return P * (1 + r / 100 * t)
+    if exact:
+        with localcontext(prec=EXACT_PRECISION):
+            total_amount = to_decimal(P) * (1 + to_decimal(r) / 100 * to_decimal(t))
+            return total_amount.quantize(CENT, ROUND_HALF_UP)
+    if is_array(P, r, t):
+        require_numpy()
+        return np.asarray(P, dtype=float) * (1 + np.asarray(r, dtype=float) / 100 * np.asarray(t, dtype=float))
+    # Other kinds of number, such as Fraction
+    return P * (1 + r / 100 * t)
+
+
+def compound_interest(P, r, t, exact: bool = False):
+    """
+    Work out the total amount of an investment with compound interest.
+
+    Args:
+        P: The amount deposited.
+        r: The interest rate, without %.
+        t: The number of years invested.
+        exact (bool): Work in decimal and round to cents, for figures
+            that must match to the cent.
+
+    Returns:
+        The total amount: a float, a Decimal if exact, or an array if
+        any of the arguments is a list or array.
+    """
+    # Plain floats and ints, the usual case, skip every other check
+    if not exact and type(P) in NUMBER_TYPES and type(r) in NUMBER_TYPES and type(t) in NUMBER_TYPES:
+        return P * math.pow((1 + r / 100), t)
+    if exact:
+        with localcontext(prec=EXACT_PRECISION):
+            total_amount = to_decimal(P) * (1 + to_decimal(r) / 100) ** to_decimal(t)
+            return total_amount.quantize(CENT, ROUND_HALF_UP)
+    if is_array(P, r, t):
+        require_numpy()
+        return np.asarray(P, dtype=float) * (1 + np.asarray(r, dtype=float) / 100) ** np.asarray(t, dtype=float)
+    # Other kinds of number, such as Fraction
+    return P * math.pow((1 + r / 100), t)
+
+
+def bond_repayment(P, annual_rate, n, exact: bool = False):
+    """
+    Work out the monthly repayment of a bond. A 0% bond is split evenly
+    over the months.
+
+    Args:
+        P: The present value of the house.
+        annual_rate: The annual interest rate, without %.
+        n: The number of months to repay the bond.
+        exact (bool): Work in decimal and round to cents, for figures
+            that must match to the cent.
+
+    Returns:
+        The monthly repayment: a float, a Decimal if exact, or an array
+        if any of the arguments is a list or array.
+    """
+    # Plain floats and ints, the usual case, skip every other check
+    if not exact and type(P) in NUMBER_TYPES and type(annual_rate) in NUMBER_TYPES and type(n) in NUMBER_TYPES:
+        i = annual_rate / 100 / 12
+        return (i * P) / (1 - (1 + i) ** (-n)) if i else P / n
+    if exact:
+        with localcontext(prec=EXACT_PRECISION):
+            P, i, n = to_decimal(P), to_decimal(annual_rate) / 100 / 12, to_decimal(n)
+            repayment = (i * P) / (1 - (1 + i) ** (-n)) if i else P / n
+            return repayment.quantize(CENT, ROUND_HALF_UP)
+    if is_array(P, annual_rate, n):
+        require_numpy()
+        P = np.asarray(P, dtype=float)
+        i = np.asarray(annual_rate, dtype=float) / 100 / 12
+        n = np.asarray(n, dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(i > 0, (i * P) / (1 - (1 + i) ** (-n)), P / n)
+    # Other kinds of number, such as Fraction
+    i = annual_rate / 100 / 12
+    return (i * P) / (1 - (1 + i) ** (-n)) if i else P / n
+
+
+def amortization_schedule(P: float, annual_rate: float, n: int):
+    """
+    Work out a loan's repayment schedule one month at a time.
+
+    Args:
+        P (float): The present value of the loan.
+        annual_rate (float): The annual interest rate, without %.
+        n (int): The number of months to repay the loan.
+
+    Yields:
+        tuple: (month, payment, interest, principal, balance) for each month.
+    """
+    i = annual_rate / 100 / 12
+    repayment = bond_repayment(P, annual_rate, n)
+    balance = P
+
+    for month in range(1, n + 1):
+        interest = balance * i
+        principal = repayment - interest
+        balance -= principal
+        yield month, repayment, interest, principal, balance
+
+
+def amortization_schedules(P, annual_rate, n):
+    """
+    Work out the repayment schedules of many loans at once with NumPy.
+
+    Every month of every loan is calculated in one go from the balance
+    formula, instead of stepping through the months in Python.
+
+    Args:
+        P (array): The present value of each loan.
+        annual_rate (array): The annual interest rate of each loan, without %.
+        n (array): The number of months to repay each loan.
+
+    Returns:
+        tuple: (payment, interest, principal, balance). payment has one
+        value per loan, the others have a row per loan and a column per
+        month, up to the longest loan. Months after a loan is paid off
+        are 0.
+    """
+    require_numpy()
+    P = np.asarray(P, dtype=float)
+    i = np.asarray(annual_rate, dtype=float) / 100 / 12
+    n = np.asarray(n, dtype=np.int64)
+
+    months = np.arange(1, int(n.max(initial=0)) + 1)
+    active = months[None, :] <= n[:, None]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # The same formula as the bond calculator, with 0% loans split evenly
+        payment = np.where(i > 0, (i * P) / (1 - (1 + i) ** (-n.astype(float))), P / n)
+
+        # Balance after m months: P(1 + i)^m - payment((1 + i)^m - 1) / i
+        growth = (1 + i)[:, None] ** months[None, :]
+        paid_back = np.where(
+            (i > 0)[:, None],
+            payment[:, None] * (growth - 1) / i[:, None],
+            payment[:, None] * months[None, :]
+        )
+    balance = np.where(active, P[:, None] * growth - paid_back, 0.0)
+    balance[np.arange(len(n)), n - 1] = 0.0  # Paid off exactly, without rounding left over
+
+    previous_balance = np.concatenate([P[:, None], balance[:, :-1]], axis=1)
+    interest = np.where(active, previous_balance * i[:, None], 0.0)
+    principal = np.where(active, payment[:, None] - interest, 0.0)
+
+    return payment, interest, principal, balance
+
+
+def write_schedules(output, P, annual_rate, n, chunk_size: int = LOANS_PER_CHUNK) -> int:
+    """
+    Write the repayment schedule of every loan to a CSV file, working
+    through the loans a chunk at a time so memory use stays the same.
+
+    Args:
+        output: A text file object to write to.
+        P (array): The present value of each loan.
+        annual_rate (array): The annual interest rate of each loan, without %.
+        n (array): The number of months to repay each loan.
+        chunk_size (int): How many loans to work out at once.
+
+    Returns:
+        int: The number of rows written.
+    """
+    require_numpy()
+    P = np.asarray(P, dtype=float)
+    annual_rate = np.asarray(annual_rate, dtype=float)
+    n = np.asarray(n, dtype=np.int64)
+    output.write(SCHEDULE_HEADER + "\n")
+    rows = 0
+
+    for start in range(0, len(P), chunk_size):
+        end = start + chunk_size
+        payment, interest, principal, balance = amortization_schedules(P[start:end], annual_rate[start:end], n[start:end])
+
+        # One row for each month of each loan, in loan then month order
+        loan, month = np.nonzero(np.arange(1, balance.shape[1] + 1)[None, :] <= n[start:end, None])
+        table = np.column_stack([
+            loan + start + 1, month + 1, payment[loan],
+            interest[loan, month], principal[loan, month], balance[loan, month]
+        ])
+        # Formatting the whole chunk with one % is much quicker than a
+        # write per row
+        output.write(SCHEDULE_ROW_FORMAT * len(table) % tuple(table.ravel().tolist()))
+        rows += len(table)
+
+    return rows
+
+
+def read_loans(path: str):
+    """
+    Read a CSV file of loans with the columns present_value, annual_rate
+    and months.
+
+    Args:
+        path (str): The file to read.
+
+    Returns:
+        tuple: (P, annual_rate, n) arrays.
+    """
+    require_numpy()
+    with open(path, "r", encoding="utf-8") as loan_file:
+        header = loan_file.readline().strip().split(",")
+        columns = [header.index(name) for name in ("present_value", "annual_rate", "months")]
+        table = np.loadtxt(loan_file, delimiter=",", usecols=columns, ndmin=2)
+
+    return table[:, 0], table[:, 1], table[:, 2].astype(np.int64)
+
+
+def investment_totals(P, r, t, compound):
+    """
+    Work out the total amount of many investments at once with NumPy.
+
+    Args:
+        P (array): The amount deposited.
+        r (array): The interest rate, as a fraction (not %).
+        t (array): The number of years invested.
+        compound (array): True for compound interest, False for simple.
+
+    Returns:
+        array: The total amount of each investment.
+    """
+    require_numpy()
+    P = np.asarray(P, dtype=float)
+    r = np.asarray(r, dtype=float)
+    t = np.asarray(t, dtype=float)
+    return np.where(compound, P * (1 + r) ** t, P * (1 + r * t))
+
+
+def parse_investment_rows(lines, line_numbers, columns, bad_lines=None):
+    """
+    Parse CSV rows of investments one at a time, for a chunk NumPy
+    couldn't parse in one go.
+
+    Args:
+        lines (list): The rows, without line endings.
+        line_numbers (list): The line in the file of each row.
+        columns (tuple): The deposit, interest_rate, years and interest
+            column positions.
+        bad_lines (list): If given, the line numbers of rows with a
+            missing or bad number are added to it.
+
+    Returns:
+        tuple: (numbers, kinds) arrays, with nan for every number of a
+        bad row.
+    """
+    deposit, rate, years, interest = columns
+    numbers = np.full((len(lines), 3), np.nan)
+    kinds = []
+    for row, line in enumerate(lines):
+        fields = line.split(",")
+        kinds.append(fields[interest] if interest < len(fields) else "")
+        try:
+            numbers[row] = [float(fields[deposit]), float(fields[rate]), float(fields[years])]
+        except (IndexError, ValueError):
+            if bad_lines is not None:
+                bad_lines.append(line_numbers[row])
+    return numbers, np.array(kinds, dtype=str)
+
+
+def write_investments(source, output, chunk_size: int = INVESTMENTS_PER_CHUNK, bad_lines: list = None) -> int:
+    """
+    Add a total_amount column to a CSV file of investments.
+
+    The file is read, worked out and written a chunk of rows at a time, so
+    memory use stays the same however long it is. Rows are copied out as
+    they are, and a row whose interest isn't 'simple' or 'compound', or
+    with a missing or bad number, gets a total_amount of nan.
+
+    Args:
+        source: A text file object with the columns deposit,
+            interest_rate (without %), years and interest.
+        output: A text file object to write to.
+        chunk_size (int): How many rows to work out at once.
+        bad_lines (list): If given, the line numbers in the file of rows
+            with a missing or bad number are added to it.
+
+    Returns:
+        int: The number of rows written, not counting the header.
+    """
+    require_numpy()
+    header = source.readline().rstrip("\r\n")
+    names = header.split(",")
+    missing = [name for name in INVESTMENT_COLUMNS if name not in names]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+    deposit, rate, years, interest = (names.index(name) for name in INVESTMENT_COLUMNS)
+    output.write(header + ",total_amount\n")
+    rows = 0
+    line_number = 2
+
+    while True:
+        chunk = list(islice(source, chunk_size))
+        if not chunk:
+            break
+        first_line = line_number
+        line_number += len(chunk)
+        lines = [line.rstrip("\r\n") for line in chunk]
+        if not all(lines):
+            line_numbers = [first_line + n for n, line in enumerate(lines) if line]
+            lines = [line for line in lines if line]
+        else:
+            line_numbers = None
+        if not lines:
+            continue
+
+        # NumPy parses the number columns and the interest column in C,
+        # with no comment character so a row starting with # is kept. If
+        # anything in the chunk isn't a number, or a row went missing, it
+        # is parsed again one row at a time, so only the bad rows lose
+        # their totals
+        try:
+            numbers = np.loadtxt(lines, delimiter=",", usecols=(deposit, rate, years), ndmin=2, comments=None)
+            kinds = np.loadtxt(lines, delimiter=",", usecols=interest, dtype=str, ndmin=1, comments=None)
+            parsed = len(numbers) == len(kinds) == len(lines)
+        except ValueError:
+            parsed = False
+        if not parsed:
+            if line_numbers is None:
+                line_numbers = range(first_line, first_line + len(lines))
+            numbers, kinds = parse_investment_rows(lines, line_numbers, (deposit, rate, years, interest), bad_lines)
+
+        # Only tidy up the case and spaces of the rows that need it
+        unusual = (kinds != "compound") & (kinds != "simple")
+        if unusual.any():
+            kinds[unusual] = np.char.lower(np.char.strip(kinds[unusual]))
+            unusual = (kinds != "compound") & (kinds != "simple")
+
+        totals = investment_totals(numbers[:, 0], numbers[:, 1] / 100, numbers[:, 2], kinds == "compound")
+        totals[unusual] = np.nan
+
+        # Formatting the whole chunk with one % is much quicker than a
+        # write per row
+        values = [value for pair in zip(lines, totals.tolist()) for value in pair]
+        output.write("%s,%.2f\n" * len(lines) % tuple(values))
+        rows += len(lines)
+
+    return rows
+
+
+@lru_cache(maxsize=32)
+def cached_factors(kind: str, rates: tuple, terms: tuple):
+    """The cached part of sweep_factors(), keyed on plain tuples."""
+
+    rate = np.array(rates, dtype=float)[:, None] / 100
+    term = np.array(terms, dtype=float)[None, :]
+
+    if kind == "simple":
+        factors = 1 + rate * term
+    elif kind == "compound":
+        factors = (1 + rate) ** term
+    else:
+        # Monthly repayment per unit borrowed, with 0% loans split evenly
+        i = rate / 12
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factors = np.where(i > 0, i / (1 - (1 + i) ** (-term)), 1 / term)
+
+    factors.setflags(write=False)
+    return factors
+
+
+def sweep_factors(kind: str, rates, terms):
+    """
+    Return the amount per unit deposited or borrowed for every rate and
+    term, such as (1 + r) ** t for compound interest.
+
+    Every amount in a sweep shares these, so they are only worked out
+    once, and remembered for the next sweep over the same rates and terms.
+
+    Args:
+        kind (str): 'simple', 'compound' or 'bond'.
+        rates (array): Annual interest rates, without %.
+        terms (array): Years for investments, months for bonds.
+
+    Returns:
+        array: A read-only array with a row per rate and a column per term.
+    """
+    require_numpy()
+    if kind not in SWEEP_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(SWEEP_KINDS)}")
+    return cached_factors(kind, tuple(np.ravel(rates).tolist()), tuple(np.ravel(terms).tolist()))
+
+
+def sweep(kind: str, rates, terms, amounts):
+    """
+    Work out a whole grid of scenarios in one go.
+
+    Args:
+        kind (str): 'simple' or 'compound' for the total amount of an
+            investment, 'bond' for the monthly repayment.
+        rates (array): Annual interest rates, without %.
+        terms (array): Years for investments, months for bonds.
+        amounts (array): Amounts deposited or borrowed.
+
+    Returns:
+        array: The results, indexed [rate, term, amount].
+    """
+    factors = sweep_factors(kind, rates, terms)
+    return factors[:, :, None] * np.asarray(amounts, dtype=float)[None, None, :]
+
+
+def sweep_summary(kind: str, rates, terms, amounts, chunk_cells: int = SWEEP_CHUNK_CELLS) -> dict:
+    """
+    Summarise a grid of scenarios that may be too big to hold in memory.
+
+    The grid is worked out a few rates at a time, keeping only running
+    totals, so memory use depends on chunk_cells rather than the grid.
+
+    Args:
+        kind (str): 'simple', 'compound' or 'bond', as for sweep().
+        rates (array): Annual interest rates, without %.
+        terms (array): Years for investments, months for bonds.
+        amounts (array): Amounts deposited or borrowed.
+        chunk_cells (int): About how many cells to work out at once.
+
+    Returns:
+        dict: The cells, min, max, mean and std of the results, and the
+        (rate, term, amount) of the min and max.
+    """
+    factors = sweep_factors(kind, rates, terms)
+    rates = np.ravel(rates)
+    terms = np.ravel(terms)
+    amounts = np.asarray(amounts, dtype=float).ravel()
+    rows = max(1, chunk_cells // max(1, factors.shape[1] * len(amounts)))
+
+    total = total_squares = 0.0
+    lowest = highest = None
+
+    for start in range(0, len(rates), rows):
+        block = factors[start:start + rows, :, None] * amounts[None, None, :]
+        total += block.sum()
+        total_squares += np.square(block).sum()
+
+        low = np.unravel_index(np.argmin(block), block.shape)
+        high = np.unravel_index(np.argmax(block), block.shape)
+        if lowest is None or block[low] < lowest[0]:
+            lowest = (block[low], (rates[start + low[0]], terms[low[1]], amounts[low[2]]))
+        if highest is None or block[high] > highest[0]:
+            highest = (block[high], (rates[start + high[0]], terms[high[1]], amounts[high[2]]))
+
+    cells = factors.size * len(amounts)
+    mean = total / cells
+    return {
+        "cells": cells,
+        "min": float(lowest[0]),
+        "max": float(highest[0]),
+        "mean": float(mean),
+        "std": float(math.sqrt(max(total_squares / cells - mean * mean, 0.0))),
+        "min_at": tuple(float(value) for value in lowest[1]),
+        "max_at": tuple(float(value) for value in highest[1]),
+    }
+
+
+def parse_range(text: str):
+    """
+    Turn 'start:stop:count' into evenly spaced values, or a single number
+    into one value.
+
+    Args:
+        text (str): The range, such as '1:20:200'.
+
+    Returns:
+        array: The values.
+    """
+    require_numpy()
+    parts = text.split(":")
+    if len(parts) == 1:
+        return np.array([float(parts[0])])
+    if len(parts) != 3:
+        raise ValueError(f"expected start:stop:count, not {text!r}")
+    return np.linspace(float(parts[0]), float(parts[1]), int(parts[2]))
+
+
+def simulate_chunk(P: float, rate: float, volatility: float, t: int, paths: int,
+                   distribution: str, seed):
+    """
+    Simulate the final amount of some investment paths. Runs in a worker
+    process when simulate_returns() is given more than one.
+
+    Args:
+        P (float): The amount deposited.
+        rate (float): The mean annual return, as a fraction (not %).
+        volatility (float): The standard deviation of the annual return,
+            as a fraction.
+        t (int): The number of years invested.
+        paths (int): How many paths to simulate.
+        distribution (str): 'normal' or 'lognormal' annual returns.
+        seed (SeedSequence): Where this chunk's random numbers come from.
+
+    Returns:
+        array: The final amount of each path.
+    """
+    rng = np.random.default_rng(seed)
+
+    if distribution == "normal":
+        # Each year grows by (1 + return), as in the compound formula
+        returns = rng.normal(rate, volatility, size=(paths, t))
+        return P * np.prod(1 + returns, axis=1)
+
+    # Lognormal growth with the same mean and standard deviation per year.
+    # Adding up log growth is the same as multiplying the growth
+    mean_growth = 1 + rate
+    sigma = math.sqrt(math.log(1 + (volatility / mean_growth) ** 2))
+    mu = math.log(mean_growth) - sigma * sigma / 2
+    log_growth = rng.normal(mu, sigma, size=(paths, t))
+    return P * np.exp(log_growth.sum(axis=1))
+
+
+def simulate_returns(P: float, rate: float, volatility: float, t: int, paths: int = 100_000,
+                     distribution: str = "normal", seed: int = None, processes: int = 1,
+                     chunk_paths: int = PATHS_PER_CHUNK):
+    """
+    Simulate compound interest with a random return each year.
+
+    Args:
+        P (float): The amount deposited.
+        rate (float): The mean annual return, without %.
+        volatility (float): The standard deviation of the annual return,
+            without %.
+        t (int): The number of years invested.
+        paths (int): How many paths to simulate.
+        distribution (str): 'normal' or 'lognormal' annual returns.
+        seed (int): Makes the results repeatable when given.
+        processes (int): How many worker processes to use, all cores if 0.
+        chunk_paths (int): How many paths to simulate at a time.
+
+    Returns:
+        array: The final amount of each path.
+    """
+    require_numpy()
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(P, rate / 100, volatility / 100, t, size, distribution, chunk_seed)
+            for size, chunk_seed in zip(sizes, seeds)]
+
+    if processes == 1 or len(jobs) < 2:
+        results = [simulate_chunk(*job) for job in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(processes or None) as pool:
+            # map() gives the results back in the order of the chunks
+            results = list(pool.map(simulate_chunk, *zip(*jobs)))
+
+    return np.concatenate(results) if results else np.empty(0)
+
+
+def monte_carlo_percentiles(P: float, rate: float, volatility: float, t: int,
+                            percentiles=(5, 25, 50, 75, 95), **options) -> dict:
+    """
+    Return percentiles of the final amount from simulate_returns().
+
+    Args:
+        P (float): The amount deposited.
+        rate (float): The mean annual return, without %.
+        volatility (float): The standard deviation of the annual return,
+            without %.
+        t (int): The number of years invested.
+        percentiles (tuple): Which percentiles to return.
+        **options: Passed on to simulate_returns().
+
+    Returns:
+        dict: The final amount at each percentile.
+    """
+    final_amounts = simulate_returns(P, rate, volatility, t, **options)
+    return dict(zip(percentiles, np.percentile(final_amounts, percentiles).tolist()))
+
+
+def main():
+    """The interactive calculator menu."""
+
+    # show the user a menu of calculator options
+    print("Investment - to calculate the amount of interest you'll earn on your investment.")
+    print("Bond - to calculate the amount you'll need to pay back on a loan.")
+
+    # request the user to choose a calculator
+    calculator_type = input("Enter either 'investment' or 'bond' from the menu above to proceed: ").lower()
+
+    # investment option
+    if calculator_type == "investment":
+        # ask user for additional inputs
+        P = float(input("Enter the amount of money to deposit: "))
+        r = float(input("Enter the interest rate (without %): "))
+        t = int(input("Enter the number of years to invest: "))
+
+        # request user to choose interest type
+        interest = input("Choose either 'simple' or 'compound' interest: ").lower()
+
+        # calculate simple or compound interest
+        if interest == "simple":
+            total_amount = simple_interest(P, r, t)
+            print(f"The total amount after {t} years with simple interest is: R{total_amount:.2f}")
+        elif interest == "compound":
+            total_amount = compound_interest(P, r, t)
+            print(f"The total amount after {t} years with compound interest is: R{total_amount:.2f}")
+        else:
+            print("Invalid interest type. Please choose either 'simple' or 'compound'.")
+
+    # bond option
+    elif calculator_type == "bond":
+        P = float(input("Enter the present value of the house: "))
+        annual_rate = float(input("Enter the annual interest rate (without %): "))
+        n = int(input("Enter the number of months to repay the bond: "))
+
+        repayment = bond_repayment(P, annual_rate, n)
+        print(f"The monthly repayment amount is: R{repayment:.2f}")
 
-# show the user a menu of calculator options
-print("Investment - to calculate the amount of interest you'll earn on your investment.")
-print("Bond - to calculate the amount you'll need to pay back on a loan.")
-
-# request the user to choose a calculator
-calculator_type = input("Enter either 'investment' or 'bond' from the menu above to proceed: ").lower()
-
-# investment option
-if calculator_type == "investment":
-    # ask user for additional inputs
-    P = float(input("Enter the amount of money to deposit: "))
-    r = float(input("Enter the interest rate (without %): ")) / 100
-    t = int(input("Enter the number of years to invest: "))
-
-    # request user to choose interest type
-    interest = input("Choose either 'simple' or 'compound' interest: ").lower()
-
-    # calculate simple or compound interest
-    if interest == "simple":
-        total_amount = P * (1 + r * t)
-        print(f"The total amount after {t} years with simple interest is: R{total_amount:.2f}")
-    elif interest == "compound":
-        total_amount = P * math.pow((1 + r), t)
-        print(f"The total amount after {t} years with compound interest is: R{total_amount:.2f}")
     else:
-        print("Invalid interest type. Please choose either 'simple' or 'compound'.")
+        print("Invalid selection. Please choose either 'investment' or 'bond'.")
 
-# bond option
-elif calculator_type == "bond":
-    P = float(input("Enter the present value of the house: "))
-    i = float(input("Enter the annual interest rate (without %): ")) / 100 / 12
-    n = int(input("Enter the number of months to repay the bond: "))
 
-    repayment = (i * P) / (1 - (1 + i) ** (-n))
-    print(f"The monthly repayment amount is: R{repayment:.2f}")
+if __name__ == "__main__":
+    import argparse
 
-else:
-    print("Invalid selection. Please choose either 'investment' or 'bond'.")
+    parser = argparse.ArgumentParser(description="Investment and bond calculators.")
+    parser.add_argument("--investment", choices=("simple", "compound"),
+                        help="work out an investment from --deposit, --rate and --years")
+    parser.add_argument("--bond", action="store_true", help="work out a bond from --present-value, --rate and --months")
+    parser.add_argument("--present-value", type=float, default=100_000, help="present value of the house for --bond")
+    parser.add_argument("--months", type=int, default=240, help="months to repay the bond for --bond")
+    parser.add_argument("--exact", action="store_true", help="work in decimal and round to the cent")
+    parser.add_argument("--schedules", metavar="CSV", help="write the repayment schedule of every loan in a CSV file")
+    parser.add_argument("--investments", metavar="CSV", help="add a total_amount column to a CSV file of investments")
+    parser.add_argument("--sweep", choices=SWEEP_KINDS, help="summarise a grid of rates x terms x amounts")
+    parser.add_argument("--rates", default="1:20:20", help="sweep rates (without %%) as start:stop:count")
+    parser.add_argument("--terms", default="1:30:30", help="sweep terms, years or bond months, as start:stop:count")
+    parser.add_argument("--amounts", default="1000:100000:100", help="sweep amounts as start:stop:count")
+    parser.add_argument("--monte-carlo", action="store_true", help="simulate random yearly returns")
+    parser.add_argument("--deposit", type=float, default=1000, help="amount deposited")
+    parser.add_argument("--rate", type=float, default=7, help="yearly interest rate, or mean return, without %%")
+    parser.add_argument("--volatility", type=float, default=15, help="standard deviation of the yearly return (without %%)")
+    parser.add_argument("--years", type=int, default=10, help="years invested")
+    parser.add_argument("--paths", type=int, default=100_000, help="paths to simulate (default 100000)")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="normal", help="yearly return distribution")
+    parser.add_argument("--seed", type=int, help="seed, to make the simulation repeatable")
+    parser.add_argument("--processes", type=int, default=1, help="processes to simulate with, 0 for all cores")
+    parser.add_argument("--output", default="-", help="where to write the results (default stdout)")
+    args = parser.parse_args()
+
+    if args.investment:
+        calculate = simple_interest if args.investment == "simple" else compound_interest
+        total_amount = calculate(args.deposit, args.rate, args.years, exact=args.exact)
+        print(f"The total amount after {args.years} years with {args.investment} interest is: R{total_amount:.2f}")
+    elif args.bond:
+        repayment = bond_repayment(args.present_value, args.rate, args.months, exact=args.exact)
+        print(f"The monthly repayment amount is: R{repayment:.2f}")
+    elif args.schedules:
+        loans = read_loans(args.schedules)
+        if args.output == "-":
+            rows = write_schedules(sys.stdout, *loans)
+        else:
+            with open(args.output, "w", encoding="utf-8") as output_file:
+                rows = write_schedules(output_file, *loans)
+        print(f"{rows} schedule rows for {len(loans[0])} loans", file=sys.stderr)
+    elif args.investments:
+        bad_lines = []
+        with open(args.investments, "r", encoding="utf-8") as source:
+            if args.output == "-":
+                rows = write_investments(source, sys.stdout, bad_lines=bad_lines)
+            else:
+                with open(args.output, "w", encoding="utf-8") as output_file:
+                    rows = write_investments(source, output_file, bad_lines=bad_lines)
+        print(f"{rows} investments", file=sys.stderr)
+        if bad_lines:
+            shown = ", ".join(str(line) for line in bad_lines[:10])
+            print(f"{len(bad_lines)} rows with a missing or bad number got nan, on lines {shown}"
+                  f"{' and more' if len(bad_lines) > 10 else ''}", file=sys.stderr)
+    elif args.sweep:
+        summary = sweep_summary(args.sweep, parse_range(args.rates), parse_range(args.terms), parse_range(args.amounts))
+        for name, value in summary.items():
+            print(f"{name}: {value}")
+    elif args.monte_carlo:
+        results = monte_carlo_percentiles(
+            args.deposit, args.rate, args.volatility, args.years, paths=args.paths,
+            distribution=args.distribution, seed=args.seed, processes=args.processes
+        )
+        for percentile, total_amount in results.items():
+            print(f"{percentile}th percentile after {args.years} years: R{total_amount:.2f}")
+    else:
+        main()
 
-# I played around a lot with this task and during that, I discovered I could input directly from the terminal. I didn't know I could do that. So this discovery helped a lot with testing this code until it worked.
\ No newline at end of file
+# I played around a lot with this task and during that, I discovered I could input directly from the terminal. I didn't know I could do that. So this discovery helped a lot with testing this code until it worked.
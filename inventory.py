@@ -4,18 +4,58 @@ manager, the goal is to maintain, analyse, and update shoe inventory data in
 order to optimise warehouse organisation and delivery efficiency.
 '''
 
-from tabulate import tabulate
+import csv
+import gc
+import heapq
+import io
+import os
+import sys
+import threading
+from collections import Counter
+from itertools import islice
+
+# tabulate is imported by the functions that print tables, so the shoe
+# store can be imported and used without it
+
+
+INVENTORY_FILE = "inventory.txt"
+INVENTORY_HEADER = ["Country", "Code", "Product", "Cost", "Quantity"]
+
+# Changed shoes are saved to the journal together, once this many have
+# built up or FLUSH_INTERVAL seconds after the first change
+FLUSH_AFTER_CHANGES = 1000
+FLUSH_INTERVAL = 2.0
+
+# The journal is folded back into inventory.txt once it has this many
+# rows, or a quarter as many rows as there are shoes if that is more
+COMPACT_AFTER = 1000
+
+# inventory.txt is read with a large buffer and added to the store this
+# many rows at a time
+LOAD_CHUNK_ROWS = 100_000
+
+# How many rejected rows a load report keeps to show as examples
+REJECTED_EXAMPLES = 10
+
+# Quantity heap entries pack a quantity and a position in shoe_list into
+# one int, quantity * 2 ** POSITION_BITS + position
+POSITION_BITS = 32
+POSITION_MASK = (1 << POSITION_BITS) - 1
 
 
 #========The beginning of the class==========
 class Shoe:
-   
+    # __slots__ stores the attributes without a dictionary for every
+    # shoe, which saves a lot of memory with large catalogues
+    __slots__ = ("country", "code", "product", "cost", "quantity")
+
     def __init__(self, country, code, product, cost, quantity):
         '''
          Initialise a Shoe object.
         '''
-        # Assigning attributes to the object
-        self.country = country
+        # Assigning attributes to the object. There are only a few
+        # countries, so every shoe shares one copy of each name
+        self.country = sys.intern(country)
         self.code = code
         self.product = product
         self.cost = cost
@@ -41,41 +81,515 @@ class Shoe:
                 f"Cost: R{self.cost} | Quantity: {self.quantity}")
 
 
-#=============Shoe list===========
+#=============Shoe store===========
+class ShoeStore:
+    '''
+    Holds every shoe in a list, in file order, and a dictionary from shoe
+    code to the shoe's position in the list, so finding a shoe by its
+    code doesn't mean going through the whole list.
+
+    Two heaps keep the shoes in order of quantity, lowest first and
+    highest first, so the lowest and highest stock can be found without
+    going through every shoe. Quantities should be changed with
+    set_quantity() or restock() so the heaps stay up to date.
+
+    The positions of shoes added or changed since the last save are kept
+    in dirty, so only those need writing out.
+    '''
+
+    def __init__(self):
+        self.shoes = []
+        self.by_code = {}
+
+        # The changes may be saved from a timer thread, so the dirty set
+        # is only swapped or added to while holding the lock
+        self.dirty = set()
+        self.lock = threading.Lock()
+
+        # Heap entries hold the quantity, negative in high_heap, and the
+        # position in the list packed into one int, which takes far less
+        # memory than a tuple. Sorting by them sorts by quantity, then
+        # position, so the first shoe in the file wins ties, as min() and
+        # max() did. Old entries are left in the heaps and skipped when
+        # they come up
+        self.low_heap = []
+        self.high_heap = []
+
+    def __len__(self):
+        return len(self.shoes)
+
+    def add(self, shoe):
+        '''
+        Add a shoe. Raises ValueError if a shoe with the same code is
+        already in the store.
+        '''
+        if shoe.code in self.by_code:
+            raise ValueError(f"duplicate shoe code: {shoe.code}")
+        position = len(self.shoes)
+        self.by_code[shoe.code] = position
+        self.shoes.append(shoe)
+        self.push_quantity(shoe)
+        with self.lock:
+            self.dirty.add(position)
+
+    def add_many(self, shoes):
+        '''
+        Add many shoes at once. Returns the positions, in shoes, of any
+        that were skipped because their code is already in the store.
+        This is for loading, so the shoes aren't marked as changed.
+        '''
+        duplicates = []
+        first = len(self.shoes)
+        for n, shoe in enumerate(shoes):
+            if shoe.code in self.by_code:
+                duplicates.append(n)
+                continue
+            self.by_code[shoe.code] = len(self.shoes)
+            self.shoes.append(shoe)
+
+        # Pushing a few shoes is quicker than rebuilding the heaps, but
+        # not for a batch that is large compared to the store
+        added = range(first, len(self.shoes))
+        if len(added) * 8 < len(self.low_heap):
+            for position in added:
+                self.push_quantity(self.shoes[position])
+        else:
+            self.rebuild_heaps()
+        return duplicates
+
+    def push_quantity(self, shoe):
+        '''
+        Add a shoe's current quantity to both heaps.
+        '''
+        position = self.by_code[shoe.code]
+        heapq.heappush(self.low_heap, shoe.quantity << POSITION_BITS | position)
+        heapq.heappush(self.high_heap, -shoe.quantity << POSITION_BITS | position)
+
+        # Rebuild the heaps once old entries outnumber the shoes
+        if len(self.low_heap) > 2 * len(self.shoes) + 64:
+            self.rebuild_heaps()
+
+    def rebuild_heaps(self):
+        '''
+        Rebuild both heaps from the shoes, dropping old entries.
+        '''
+        self.low_heap = [shoe.quantity << POSITION_BITS | n for n, shoe in enumerate(self.shoes)]
+        self.high_heap = [-shoe.quantity << POSITION_BITS | n for n, shoe in enumerate(self.shoes)]
+        heapq.heapify(self.low_heap)
+        heapq.heapify(self.high_heap)
+
+    def set_quantity(self, shoe, quantity):
+        '''
+        Change the quantity of a shoe in the store.
+        '''
+        shoe.quantity = quantity
+        self.push_quantity(shoe)
+        with self.lock:
+            self.dirty.add(self.by_code[shoe.code])
+
+    def restock(self, shoe, amount):
+        '''
+        Add stock to a shoe in the store.
+        '''
+        self.set_quantity(shoe, shoe.quantity + amount)
+
+    def take_from_heap(self, heap, k, sign):
+        '''
+        Return the first k shoes from a quantity heap. The entries are
+        popped to find them and then pushed back, skipping old ones.
+        '''
+        entries = []
+        found = []
+        seen = set()
+        while heap and len(entries) < k:
+            entry = heapq.heappop(heap)
+            position = entry & POSITION_MASK
+            shoe = self.shoes[position]
+
+            # Drop entries for an older quantity, or a second entry for
+            # the same quantity
+            if shoe.quantity * sign != entry >> POSITION_BITS or position in seen:
+                continue
+            seen.add(position)
+            entries.append(entry)
+            found.append(shoe)
+
+        for entry in entries:
+            heapq.heappush(heap, entry)
+        return found
+
+    def lowest(self, k=1):
+        '''
+        Return the k shoes with the lowest quantity, lowest first.
+        '''
+        return self.take_from_heap(self.low_heap, k, 1)
+
+    def highest(self, k=1):
+        '''
+        Return the k shoes with the highest quantity, highest first.
+        '''
+        return self.take_from_heap(self.high_heap, k, -1)
+
+    def total_value(self):
+        '''
+        Return the total value of all the stock, cost * quantity.
+        '''
+        return sum(shoe.cost * shoe.quantity for shoe in self.shoes)
+
+    def total_quantity(self):
+        '''
+        Return the number of shoes in stock, of every kind.
+        '''
+        return sum(shoe.quantity for shoe in self.shoes)
+
+    def find(self, code):
+        '''
+        Return the shoe with the given code, or None.
+        '''
+        position = self.by_code.get(code)
+        return None if position is None else self.shoes[position]
+
+    def find_many(self, codes):
+        '''
+        Return a list with the shoe for each code, or None where there
+        isn't one, in the same order as the codes.
+        '''
+        shoes = self.shoes
+        return [None if position is None else shoes[position] for position in map(self.by_code.get, codes)]
+
+    def take_changes(self):
+        '''
+        Return the shoes added or changed since the last call, in file
+        order, and start tracking changes afresh.
+        '''
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+        return [self.shoes[position] for position in sorted(dirty)]
+
+    def return_changes(self, shoes):
+        '''
+        Mark shoes from take_changes() as changed again, when saving
+        them failed.
+        '''
+        with self.lock:
+            self.dirty.update(self.by_code[shoe.code] for shoe in shoes)
+
+    def clear(self):
+        '''
+        Remove every shoe.
+        '''
+        self.shoes.clear()
+        self.by_code.clear()
+        self.low_heap.clear()
+        self.high_heap.clear()
+        with self.lock:
+            self.dirty.clear()
+
+
+'''
+The store holds all the Shoe objects created from the text file.
+shoe_list is the same list as store.shoes, so code that goes through
+every shoe can still use it.
+'''
+store = ShoeStore()
+shoe_list = store.shoes
+
+
+#==========Loading the inventory===========
+class LoadReport:
+    '''
+    A summary of loading an inventory file: how many rows were loaded,
+    how many were rejected for each reason, and a few examples.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.loaded = 0
+        self.rejected = Counter()
+        self.examples = []
+
+    def reject(self, line_number, reason, row):
+        '''
+        Count a rejected row, keeping the first few as examples.
+        '''
+        self.rejected[reason] += 1
+        if len(self.examples) < REJECTED_EXAMPLES:
+            self.examples.append((line_number, reason, ",".join(row)))
+
+    def summary(self):
+        '''
+        Return the report as text to print.
+        '''
+        lines = [f"Loaded {self.loaded} shoes from {self.path}."]
+        if self.rejected:
+            lines.append(f"Rejected {sum(self.rejected.values())} rows:")
+            for reason, count in self.rejected.most_common():
+                lines.append(f"  {count} x {reason}")
+            lines.append("For example:")
+            for line_number, reason, row in self.examples:
+                lines.append(f"  line {line_number} ({reason}): {row}")
+        return "\n".join(lines)
+
+
+def parse_rows(rows, report, first_line=2):
+    '''
+    Turn csv rows into Shoe objects, recording bad rows in the report.
+    Product names can contain commas if they are quoted. Returns the
+    shoes and, for each one, the position in rows it came from.
+    '''
+    shoes = []
+    sources = []
+    for line_number, row in enumerate(rows, first_line):
+        if len(row) != 5:
+            if row:  # Blank lines are just skipped
+                report.reject(line_number, f"expected 5 fields, found {len(row)}", row)
+            continue
+
+        country, code, product, cost, quantity = row
+        try:
+            shoes.append(Shoe(country, code, product, float(cost), int(quantity)))
+            sources.append(line_number - first_line)
+        except ValueError:
+            report.reject(line_number, "cost or quantity is not a number", row)
+
+    return shoes, sources
+
+
+def load_inventory(path=INVENTORY_FILE, inventory=None, chunk_rows=LOAD_CHUNK_ROWS):
+    '''
+    Stream an inventory file of any size into a ShoeStore, a large chunk
+    of rows at a time. Bad rows and duplicate codes are collected in the
+    returned LoadReport instead of being printed one by one.
+    '''
+    if inventory is None:
+        inventory = store
+    report = LoadReport(path)
+
+    # Every shoe is kept, so there is nothing for the garbage collector to
+    # find, but it would go through all of them again and again as the
+    # store grows. Turning it off makes large files load several times
+    # quicker
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "r", newline="", buffering=1024 * 1024) as f:
+            reader = csv.reader(f)
+            next(reader, None)  # Skip the header line
+
+            line_number = 2
+            while True:
+                rows = list(islice(reader, chunk_rows))
+                if not rows:
+                    break
+
+                shoes, sources = parse_rows(rows, report, line_number)
+                duplicates = inventory.add_many(shoes)
+                for n in duplicates:
+                    report.reject(line_number + sources[n], "duplicate shoe code", rows[sources[n]])
+                report.loaded += len(shoes) - len(duplicates)
+                line_number += len(rows)
+    finally:
+        if collecting:
+            gc.enable()
+
+    return report
+
+
+#==========Saving the inventory===========
+def shoe_row(shoe):
+    '''
+    Return a shoe as a row of inventory.txt.
+    '''
+    return [shoe.country, shoe.code, shoe.product, shoe.cost, shoe.quantity]
+
+
+def journal_path(path):
+    '''
+    Return the journal file for an inventory file, inventory_journal.txt
+    for inventory.txt.
+    '''
+    root, extension = os.path.splitext(path)
+    return f"{root}_journal{extension or '.txt'}"
+
+
+class InventoryFile:
+    '''
+    Saves the shoes in a store to an inventory file, without writing
+    every shoe out again for each change.
+
+    Changed shoes are written behind: changed() starts a timer, and all
+    the shoes changed by the time it goes off, or once FLUSH_AFTER_CHANGES
+    have built up, are appended to the journal file as inventory rows in
+    one write. Once the journal is long enough it is folded back into a
+    fresh copy of the inventory file, which is written to a temporary
+    file and renamed into place so a crash can't leave it half written.
+    '''
+
+    def __init__(self, inventory, path=INVENTORY_FILE,
+                 flush_after=FLUSH_AFTER_CHANGES, flush_interval=FLUSH_INTERVAL):
+        self.inventory = inventory
+        self.path = path
+        self.journal_path = journal_path(path)
+        self.flush_after = flush_after
+        self.flush_interval = flush_interval
+        self.journal_rows = 0
+        self.timer = None
+
+        # Only one flush at a time, from the menu or the timer
+        self.lock = threading.Lock()
+
+    def load(self, path=None):
+        '''
+        Load the inventory file, or another one to save to from now on,
+        and apply the changes in its journal. Returns the LoadReport.
+        '''
+        if path is not None:
+            self.path = path
+            self.journal_path = journal_path(path)
+        if os.path.exists(self.path) or not os.path.exists(self.journal_path):
+            report = load_inventory(self.path, self.inventory)
+        else:
+            # Nothing but the journal has been saved yet
+            report = LoadReport(self.path)
+
+        # Changes left in the journal by a crash are folded into the
+        # inventory file, so the journal starts empty. That includes a
+        # journal holding nothing but a row cut off by the crash, or the
+        # next flush would be joined onto it
+        self.replay_journal(report)
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path):
+            self.compact()
+        self.inventory.take_changes()
+        return report
+
+    def replay_journal(self, report):
+        '''
+        Apply the journal rows to the store, returns how many were applied.
+        Each row holds a shoe as it was when saved, so applying the same
+        row twice gives the same result. Bad rows are counted in the report.
+        '''
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        with open(self.journal_path, "r", newline="") as journal:
+            lines = journal.readlines()
+
+        # A line without a newline was cut off by a crash, ignore it
+        if lines and not lines[-1].endswith("\n"):
+            lines.pop()
+
+        journal_report = LoadReport(self.journal_path)
+        shoes, _ = parse_rows(csv.reader(lines), journal_report, 1)
+        for reason, count in journal_report.rejected.items():
+            report.rejected[f"{reason} (in the journal)"] += count
+        for shoe in shoes:
+            existing = self.inventory.find(shoe.code)
+            if existing is None:
+                self.inventory.add(shoe)
+            else:
+                existing.country = shoe.country
+                existing.product = shoe.product
+                existing.cost = shoe.cost
+                self.inventory.set_quantity(existing, shoe.quantity)
+        return len(shoes)
+
+    def changed(self):
+        '''
+        Call after adding or changing shoes in the store. They are saved
+        straight away once enough changes have built up, otherwise within
+        flush_interval seconds.
+        '''
+        if len(self.inventory.dirty) >= self.flush_after:
+            self.flush()
+            return
+
+        with self.lock:
+            if self.timer is None:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        '''
+        Append every shoe changed since the last flush to the journal.
+        '''
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+            shoes = self.inventory.take_changes()
+            if not shoes:
+                return
+
+            # Write the whole batch of rows with a single fsync. If that
+            # fails the shoes are still changed, so the next flush or
+            # close() tries again
+            rows = io.StringIO()
+            csv.writer(rows, lineterminator="\n").writerows(map(shoe_row, shoes))
+            try:
+                with open(self.journal_path, "a", newline="") as journal:
+                    journal.write(rows.getvalue())
+                    journal.flush()
+                    os.fsync(journal.fileno())
+            except OSError:
+                self.inventory.return_changes(shoes)
+                raise
+            self.journal_rows += len(shoes)
+
+            if self.journal_rows >= max(COMPACT_AFTER, len(self.inventory) // 4):
+                self.compact()
+
+    def compact(self):
+        '''
+        Write a fresh inventory file and clear the journal.
+        '''
+        update_inventory_file(self.path, self.inventory)
+
+        # Only clear the journal once the new inventory file is in place
+        with open(self.journal_path, "w"):
+            pass
+        self.journal_rows = 0
+
+    def close(self):
+        '''
+        Save any changes still waiting, and fold the journal into the
+        inventory file before leaving.
+        '''
+        try:
+            self.flush()
+        except OSError:
+            # The journal can't be written, but a fresh inventory file
+            # holds every change too
+            pass
+        with self.lock:
+            if self.journal_rows or self.inventory.dirty:
+                self.compact()
+                self.inventory.take_changes()
+
+
 '''
-The list will be used to store a list of objects of shoes.
+inventory_file saves the changes made to the store to inventory.txt.
 '''
-# This list will store all Shoe objects created from the text file
-shoe_list = []
+inventory_file = InventoryFile(store)
 
 
 #==========Functions outside the class==============
-def read_shoes_data():
+def read_shoes_data(path=INVENTORY_FILE):
     '''
-    Reads data from inventory.txt, creates Shoe objects,
+    Reads data from an inventory file, creates Shoe objects,
     and saves them in shoe_list. Includes error handling.
     '''
     try:
-        # Try to open the inventory file
-        with open("inventory.txt", "r") as f:
-            next(f)  # Skip the header line
-
-            # Read the rest of the lines
-            for line in f:
-                try:
-                    # Split the line by commas
-                    country, code, product, cost, quantity = line.strip().split(",")
-
-                    # Create a Shoe object and append it to the shoe list
-                    shoe = Shoe(country, code, product, float(cost), int(quantity))
-                    shoe_list.append(shoe)
-                except ValueError:
-                    # Handles formatting errors
-                    print(f"Error reading line: {line.strip()}")
-
+        report = inventory_file.load(path)
     except FileNotFoundError:
         # Handles missing file
-        print("inventory.txt file not found.")
+        print(f"{path} file not found.")
+        return
+
+    # One summary instead of a message for every bad line
+    if report.rejected:
+        print(report.summary())
 
 def capture_shoes():
     '''
@@ -84,6 +598,9 @@ def capture_shoes():
    # Collect data from user
     country = input("Country: ")
     code = input("Code: ")
+    if store.find(code) is not None:
+        print("A shoe with that code already exists.")
+        return
     product = input("Product Name: ")
 
     try:
@@ -92,7 +609,8 @@ def capture_shoes():
 
         # Create and store the new object
         new_shoe = Shoe(country, code, product, cost, quantity)
-        shoe_list.append(new_shoe)
+        store.add(new_shoe)
+        inventory_file.changed()
 
         print("Shoe added successfully.")
 
@@ -103,6 +621,8 @@ def view_all():
     '''
     Prints all shoes using the __str__ method.
     '''
+    from tabulate import tabulate
+
     if not shoe_list: # Handle empty list
         print("No shoes loaded.")
         return
@@ -129,14 +649,14 @@ def view_all():
 def re_stock():
     '''
     Finds the shoe with the lowest quantity and allows user to restock it.
-    Updates the text file afterwards.
+    The change is saved to the text file shortly afterwards.
     '''
     if not shoe_list: # Handle empty list
         print("No shoes loaded.")
         return
     
-    # Find the shoe with the lowest quantity using lambda
-    lowest_stock_shoe = min(shoe_list, key=lambda s: s.quantity)
+    # Find the shoe with the lowest quantity from the store's index
+    lowest_stock_shoe = store.lowest()[0]
     print(f"Shoe with the lowest stock: {lowest_stock_shoe}")
 
     # Ask user if they want to restock
@@ -144,35 +664,68 @@ def re_stock():
     if choice == "yes":
         try:
             amount = int(input("Enter the quantity to add: "))
-            lowest_stock_shoe.quantity += amount
+            store.restock(lowest_stock_shoe, amount)
 
             # Save changes to file
-            update_inventory_file()
+            inventory_file.changed()
             print("Stock updated successfully.")
 
         except ValueError:
             print("Invalid input. Please enter a numeric value.")
 
+def re_stock_many():
+    '''
+    Shows the shoes with the lowest quantities and allows user to restock
+    any of them. The changes are saved to the text file together.
+    '''
+    if not shoe_list: # Handle empty list
+        print("No shoes loaded.")
+        return
+
+    try:
+        count = int(input("How many of the lowest stock items would you like to see? "))
+    except ValueError:
+        print("Invalid input. Please enter a numeric value.")
+        return
+
+    restocked = 0
+    for shoe in store.lowest(count):
+        print(shoe)
+        amount = input("Enter the quantity to add (leave blank to skip): ").strip()
+        if not amount:
+            continue
+        try:
+            store.restock(shoe, int(amount))
+            restocked += 1
+        except ValueError:
+            print("Invalid input, skipping this item.")
+
+    # Save all the changes to the file at once
+    if restocked:
+        inventory_file.changed()
+        print(f"{restocked} item(s) restocked successfully.")
+
 def search_shoe():
     '''
-    Search for a shoe using its code.
+    Search for one or more shoes using their codes.
     '''
-    code = input("\nEnter shoe code to search: ")
+    codes = input("\nEnter shoe code to search (separate several with commas): ")
+    codes = [code.strip() for code in codes.split(",") if code.strip()]
 
-    # Search through the shoe list
-    for shoe in shoe_list:
-        if shoe.code == code:
+    # Look every code up in the store's index
+    for code, shoe in zip(codes, store.find_many(codes)):
+        if shoe is not None:
             print(shoe)
-            return # Exit after finding the shoe
-
-    # If no match found
-    print("No shoe found with that code.")
+        else:
+            print(f"No shoe found with code {code}.")
 
 def value_per_item():
     '''
     Calculates and prints the total value of each shoe:
     Formula: cost * quantity
     '''
+    from tabulate import tabulate
+
     # Prepare data for tabulation
     total_value = []
 
@@ -190,6 +743,7 @@ def value_per_item():
     # Print the table
     print("\n=== Total Value per Item ===")
     print(tabulate(total_value, headers=headers, tablefmt="grid"))
+    print(f"Total stock value: R{store.total_value():.2f}")
 
 def highest_qty():
     '''
@@ -199,36 +753,74 @@ def highest_qty():
         print("No shoes in inventory yet.")
         return
     
-    # Find the shoe with the highest quantity using lambda
-    highest_stock_shoe = max(shoe_list, key=lambda s: s.quantity)
+    # Find the shoe with the highest quantity from the store's index
+    highest_stock_shoe = store.highest()[0]
 
     print(f"{highest_stock_shoe.product} ({highest_stock_shoe.code})")
     print(f"In Stock: {highest_stock_shoe.quantity}")
     print("STATUS: *** FOR SALE ***")
 
-def update_inventory_file():
+def highest_qty_many():
     '''
-    Writes the updated shoe_list back into inventory.txt.
-    Ensures file is always up to date after restocking.
+    Shows the shoes with the highest quantities, highest first.
     '''
-    with open("inventory.txt", "w") as f:
-        # Write the heade
-        f.write("Country,Code,Product,Cost,Quantity\n")
+    if not shoe_list: # Handle empty list
+        print("No shoes in inventory yet.")
+        return
 
-        # Wite each shoe object
-        for s in shoe_list:
-            f.write(f"{s.country},{s.code},{s.product},{s.cost},{s.quantity}\n")
+    try:
+        count = int(input("How many of the highest stock items would you like to see? "))
+    except ValueError:
+        print("Invalid input. Please enter a numeric value.")
+        return
+
+    for shoe in store.highest(count):
+        print(shoe)
+
+def update_inventory_file(path=INVENTORY_FILE, inventory=None):
+    '''
+    Writes every shoe in the store back into inventory.txt.
+    The file is written to a temporary file and renamed into place,
+    so a crash can't leave it half written.
+    '''
+    if inventory is None:
+        inventory = store
+
+    temp_file = path + ".tmp"
+    with open(temp_file, "w", newline="") as f:
+        # The csv module quotes any product names with commas in them
+        writer = csv.writer(f, lineterminator="\n")
+
+        # Write the header
+        writer.writerow(INVENTORY_HEADER)
+
+        # Write each shoe object
+        writer.writerows(map(shoe_row, inventory.shoes))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
 
 
 #==========Main Menu=============
-'''
-Main loop menu allowing user to navigate the program.
-'''
-read_shoes_data()  # Load data at program start
+def main():
+    '''
+    Main loop menu allowing user to navigate the program.
+    '''
+    read_shoes_data()  # Load data at program start
+
+    try:
+        menu()
+    finally:
+        # Save any changes still waiting, even after Ctrl+C
+        inventory_file.close()
 
-while True:
-    # Display menu options
-    print("""
+def menu():
+    '''
+    Show the menu and run the chosen options until the user exits.
+    '''
+    while True:
+        # Display menu options
+        print("""
 ========== Inventory Menu ==========
 1. View all shoes
 2. Add a new shoe
@@ -236,30 +828,37 @@ while True:
 4. Search shoe by code
 5. View value per item
 6. Show item with highest quantity
-7. Exit
+7. Restock several lowest quantity items
+8. Show items with the highest quantities
+9. Exit
 """)
-    
-    choice = input("Enter your choice: ")
-
-    # Matching input to function
-    if choice == "1":
-        view_all()
-    elif choice == "2":
-        capture_shoes()
-    elif choice == "3":
-        re_stock()
-    elif choice == "4":
-        search_shoe()
-    elif choice == "5":
-        value_per_item()
-    elif choice == "6":
-        highest_qty()
-    elif choice == "7":
-        print("Exiting program.")
-        break
-    else:
-        print("Invalid choice. Please select a valid option.")
+
+        choice = input("Enter your choice: ")
+
+        # Matching input to function
+        if choice == "1":
+            view_all()
+        elif choice == "2":
+            capture_shoes()
+        elif choice == "3":
+            re_stock()
+        elif choice == "4":
+            search_shoe()
+        elif choice == "5":
+            value_per_item()
+        elif choice == "6":
+            highest_qty()
+        elif choice == "7":
+            re_stock_many()
+        elif choice == "8":
+            highest_qty_many()
+        elif choice == "9":
+            print("Exiting program.")
+            break
+        else:
+            print("Invalid choice. Please select a valid option.")
+
 
 # Program entry point
 if __name__ == "__main__":
-    read_shoes_data()
\ No newline at end of file
+    main()
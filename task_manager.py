@@ -8,7 +8,24 @@ This program allows users to:
 - Generate task and user overview reports
 - Display task and user statistics (admin only)
 
-The data is stored in 'user.txt' and 'tasks.txt' text files.
+The data is stored in 'user.txt' and 'tasks.txt' text files. Changes to
+tasks are appended to 'tasks_journal.txt' and folded into 'tasks.txt' from
+time to time. Alternatively everything can be kept in an SQLite database:
+
+    python task_manager.py --backend sqlite
+    python task_manager.py --backend text --migrate-to sqlite
+
+Many users can share the same data by running a task server and connecting
+the menu to it:
+
+    python task_manager.py --serve
+    python task_manager.py --backend remote
+
+Passwords are stored as salted hashes. Older files with plain text
+passwords still work, and are upgraded as users log in or all at once with:
+
+    python task_manager.py --hash-passwords
+
 Reports are saved to 'task_overview.txt' and 'user_overview.txt'.
 
 Admin credentials:
@@ -17,11 +34,1474 @@ password: password
 """
 
 #=====importing libraries===========
+import argparse
+import asyncio
+import csv
+import hashlib
+import hmac
+import json
 import os
+import signal
+import socket
+import sqlite3
+import sys
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date
+from functools import lru_cache, partial
+from itertools import islice
 
 DATETIME_STRING_FORMAT = "%Y-%m-%d"
 
+# tasks.txt is a snapshot of every task. Edits are appended to the journal
+# and folded back into the snapshot once there are COMPACT_AFTER of them,
+# or a quarter as many as there are tasks if that is more.
+USER_FILE = "user.txt"
+TASKS_FILE = "tasks.txt"
+JOURNAL_FILE = "tasks_journal.txt"
+COMPACT_AFTER = 1000
+
+# Used instead of the text files with --backend sqlite
+DATABASE_FILE = "tasks.db"
+
+# Where --serve listens and --backend remote connects
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+
+# Passwords are stored as salted hashes. Raising the cost makes each
+# password slower to check, for us and for anyone guessing passwords.
+# Stored passwords are upgraded to these settings when their user logs in.
+PASSWORD_KDF = "scrypt"  # or "pbkdf2_sha256"
+SCRYPT_COST = "16384:8:1"  # n:r:p
+PBKDF2_ITERATIONS = 600_000
+PASSWORD_KDFS = ("scrypt", "pbkdf2_sha256")
+
+# The task server remembers verified logins for a while
+LOGIN_CACHE_SIZE = 10_000
+LOGIN_CACHE_TTL = 300  # seconds
+
+# The last reports generated, reused by display_statistics() until
+# report_key() changes
+report_cache = {"key": None, "task_overview": "", "user_overview": ""}
+
+# === Passwords ===
+def hash_password(password, kdf=PASSWORD_KDF, cost=None):
+    """Return a salted hash of a password, as stored in user.txt.
+
+    The result looks like 'kdf$cost$salt$hash', so the settings used for
+    each password are kept with it and can be changed later on.
+    """
+    salt = os.urandom(16)
+
+    if kdf == "scrypt":
+        cost = cost or SCRYPT_COST
+        n, r, p = (int(part) for part in cost.split(":"))
+        digest = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                                maxmem=256 * n * r, dklen=32)
+    elif kdf == "pbkdf2_sha256":
+        cost = cost or PBKDF2_ITERATIONS
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, int(cost))
+    else:
+        raise ValueError(f"Unknown password hashing method: {kdf}")
+
+    return f"{kdf}${cost}${salt.hex()}${digest.hex()}"
+
+def is_password_hash(stored_password):
+    """Check if a stored password is a complete, well formed hash."""
+
+    parts = stored_password.split("$")
+    if len(parts) != 4 or parts[0] not in PASSWORD_KDFS:
+        return False
+
+    kdf, cost, salt, digest = parts
+    try:
+        if kdf == "scrypt":
+            n, r, p = (int(part) for part in cost.split(":"))
+        else:
+            int(cost)
+        salt = bytes.fromhex(salt)
+        digest = bytes.fromhex(digest)
+    except ValueError:
+        return False
+    return len(salt) > 0 and len(digest) == 32
+
+def looks_like_hash(stored_password):
+    """Check if a stored password is meant to be a hash rather than plain
+    text, whether or not it is well formed."""
+
+    return any(stored_password.startswith(kdf + "$") for kdf in PASSWORD_KDFS)
+
+def is_cut_off_hash(stored_password):
+    """Check if a stored password could be a hash that was cut off, down
+    to just the start of one, such as 'scr'."""
+
+    if is_password_hash(stored_password):
+        return False
+    return any(
+        stored_password.startswith(kdf + "$") or (kdf + "$").startswith(stored_password)
+        for kdf in PASSWORD_KDFS
+    )
+
+def verify_password(password, stored_password):
+    """Check a password against its stored hash.
+
+    Passwords saved as plain text before hashing was added are still
+    accepted, so existing user.txt files keep working. A hash that isn't
+    well formed never matches, so a damaged one can't be used as a plain
+    text password.
+    """
+    if not looks_like_hash(stored_password):
+        return hmac.compare_digest(password.encode("utf-8"), stored_password.encode("utf-8"))
+    if not is_password_hash(stored_password):
+        return False
+
+    kdf, cost, salt, digest = stored_password.split("$")
+    salt = bytes.fromhex(salt)
+
+    if kdf == "scrypt":
+        n, r, p = (int(part) for part in cost.split(":"))
+        attempt = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                                 maxmem=256 * n * r, dklen=32)
+    elif kdf == "pbkdf2_sha256":
+        attempt = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, int(cost))
+    else:
+        return False
+
+    return hmac.compare_digest(attempt.hex(), digest)
+
+def check_password(password, stored_password):
+    """Check a password against its stored hash.
+
+    Returns (matches, new hash), where the new hash is None unless the
+    stored one is plain text or uses old settings. Nothing is saved, so
+    this can run on a worker thread.
+    """
+    if not verify_password(password, stored_password):
+        return False, None
+    if needs_rehash(stored_password):
+        return True, hash_password(password)
+    return True, None
+
+def needs_rehash(stored_password):
+    """Check if a stored password is plain text or uses old settings."""
+
+    cost = SCRYPT_COST if PASSWORD_KDF == "scrypt" else PBKDF2_ITERATIONS
+    return not stored_password.startswith(f"{PASSWORD_KDF}${cost}$")
+
+
+class LoginCache:
+    """Remembers recently verified logins for a short while.
+
+    Checking a password is slow on purpose, so a server handling many
+    logins from the same users would spend most of its time hashing. A
+    cached login is confirmed with a quick keyed hash instead. Passwords
+    are never kept, only an HMAC of the password and its stored hash under
+    a key that only lives as long as the process, so changing a password
+    makes the old entry useless straight away.
+    """
+
+    def __init__(self, max_entries=LOGIN_CACHE_SIZE, ttl=LOGIN_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.secret = os.urandom(32)
+        # username -> (token, expiry time), oldest first
+        self.entries = OrderedDict()
+
+    def token(self, username, stored_password, password):
+        """Return the quick keyed hash a cached login is checked against."""
+
+        message = "\0".join((username, stored_password, password)).encode("utf-8")
+        return hmac.new(self.secret, message, "sha256").digest()
+
+    def is_cached(self, username, stored_password, password):
+        """Check if a login was verified recently."""
+
+        self.evict_expired(time.monotonic())
+        entry = self.entries.get(username)
+        return bool(entry) and hmac.compare_digest(entry[0], self.token(username, stored_password, password))
+
+    def remember(self, username, stored_password, password):
+        """Cache a login that has just been verified."""
+
+        self.entries.pop(username, None)
+        self.entries[username] = (self.token(username, stored_password, password), time.monotonic() + self.ttl)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def evict_expired(self, now):
+        """Drop the entries whose time is up."""
+
+        # Entries are added with the same ttl, so the oldest expire first
+        while self.entries:
+            token, expiry = next(iter(self.entries.values()))
+            if expiry > now:
+                break
+            self.entries.popitem(last=False)
+
+
+# === Task record ===
+class Task:
+    """A single task.
+
+    Uses __slots__ instead of a dictionary per task, which keeps the
+    memory for a large task list down to a fraction.
+    """
+    __slots__ = ("username", "title", "description", "due_date", "assigned_date", "completed")
+
+    def __init__(self, username, title, description, due_date, assigned_date, completed=False):
+        self.username = username
+        self.title = title
+        self.description = description
+        self.due_date = due_date
+        self.assigned_date = assigned_date
+        self.completed = completed
+
+@lru_cache(maxsize=4096)
+def parse_date(text):
+    """Parse a YYYY-MM-DD date.
+
+    Slicing the fixed format is a lot faster than datetime.strptime, and
+    as most tasks share a handful of dates the results are cached too.
+    """
+    if len(text) != 10 or text[4] != "-" or text[7] != "-":
+        raise ValueError(f"Invalid date: {text}")
+    return date(int(text[:4]), int(text[5:7]), int(text[8:]))
+
+
+# === Task store ===
+class TaskStore:
+    """Holds every task along with indexes for the common lookups.
+
+    A task's id is its position in the store. Tasks are never removed,
+    so the id stays the same for the life of the task. The report counts
+    are kept up to date as tasks change, so reports never need to look
+    at every task. Incomplete tasks have no set of their own, the due
+    date buckets hold every one of them.
+    """
+
+    def __init__(self):
+        self.tasks = []
+        # Goes up by one with every change, so callers can tell when
+        # anything they worked out from the tasks is out of date
+        self.version = 0
+        # username -> set of task ids
+        self.by_user = {}
+        # Ids of the completed tasks
+        self.completed = set()
+        # username -> number of completed tasks
+        self.user_completed = {}
+        # Incomplete tasks grouped by due date, with the dates kept sorted
+        self.due_buckets = {}
+        self.due_dates = []
+        # Overdue counts are worked out for one day at a time and only
+        # move forward when the date changes
+        self.overdue_as_of = None
+        self.overdue_count = 0
+        self.user_overdue = {}
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __iter__(self):
+        return iter(self.tasks)
+
+    def __getitem__(self, task_id):
+        # Ids are positions in the list, but a negative one would count
+        # from the end and pick another task
+        if type(task_id) is not int or not 0 <= task_id < len(self.tasks):
+            raise KeyError(f"No task with id {task_id}")
+        return self.tasks[task_id]
+
+    def add(self, task):
+        """Add a task to the store and return its id."""
+
+        task_id = len(self.tasks)
+        self.tasks.append(task)
+        self.version += 1
+        self.by_user.setdefault(task.username, set()).add(task_id)
+
+        if task.completed:
+            self.completed.add(task_id)
+            self._count(self.user_completed, task.username, 1)
+        else:
+            self._add_due(task_id, task)
+        return task_id
+
+    def complete(self, task_id):
+        """Mark a task as complete."""
+
+        task = self[task_id]
+        if task.completed:
+            return
+
+        self.version += 1
+        self._remove_due(task_id, task)
+        task.completed = True
+        self.completed.add(task_id)
+        self._count(self.user_completed, task.username, 1)
+
+    def reassign(self, task_id, username):
+        """Move a task over to another user."""
+
+        task = self[task_id]
+        self.version += 1
+        old_username = task.username
+        self.by_user[old_username].discard(task_id)
+        self.by_user.setdefault(username, set()).add(task_id)
+
+        # Move the task's share of the counts over to the new user
+        if task.completed:
+            self._count(self.user_completed, old_username, -1)
+            self._count(self.user_completed, username, 1)
+        elif self._is_overdue(task):
+            self._count(self.user_overdue, old_username, -1)
+            self._count(self.user_overdue, username, 1)
+        task.username = username
+
+    def redate(self, task_id, due_date):
+        """Change the due date of a task."""
+
+        task = self[task_id]
+        self.version += 1
+        if task.completed:
+            task.due_date = due_date
+            return
+
+        self._remove_due(task_id, task)
+        task.due_date = due_date
+        self._add_due(task_id, task)
+
+    def tasks_for_user(self, username):
+        """Return (task id, task) pairs for a user, oldest task first."""
+
+        task_ids = sorted(self.by_user.get(username, ()))
+        return [(task_id, self.tasks[task_id]) for task_id in task_ids]
+
+    def overdue(self, today):
+        """Return (task id, task) pairs of incomplete tasks due before today."""
+
+        cutoff = bisect_left(self.due_dates, today)
+        return [
+            (task_id, self.tasks[task_id])
+            for due_date in self.due_dates[:cutoff]
+            for task_id in sorted(self.due_buckets[due_date])
+        ]
+
+    def refresh_overdue(self, today):
+        """Bring the overdue counts up to date for today.
+
+        Only the due date buckets that became overdue since the last
+        refresh are counted, so this is free when the date hasn't changed.
+        """
+        if self.overdue_as_of == today:
+            return
+
+        if self.overdue_as_of is None or today < self.overdue_as_of:
+            # First refresh, or the clock went backwards, so start again
+            self.overdue_count = 0
+            self.user_overdue = {}
+            start = 0
+        else:
+            start = bisect_left(self.due_dates, self.overdue_as_of)
+
+        end = bisect_left(self.due_dates, today)
+        for due_date in self.due_dates[start:end]:
+            for task_id in self.due_buckets[due_date]:
+                self.overdue_count += 1
+                self._count(self.user_overdue, self.tasks[task_id].username, 1)
+        self.overdue_as_of = today
+
+    def _is_overdue(self, task):
+        """Check if an incomplete task is included in the overdue counts."""
+
+        return self.overdue_as_of is not None and task.due_date < self.overdue_as_of
+
+    def _add_due(self, task_id, task):
+        """Put an incomplete task in its due date bucket."""
+
+        due_date = task.due_date
+        if due_date not in self.due_buckets:
+            self.due_buckets[due_date] = set()
+            insort(self.due_dates, due_date)
+        self.due_buckets[due_date].add(task_id)
+
+        if self._is_overdue(task):
+            self.overdue_count += 1
+            self._count(self.user_overdue, task.username, 1)
+
+    def _remove_due(self, task_id, task):
+        """Take an incomplete task out of its due date bucket."""
+
+        due_date = task.due_date
+        bucket = self.due_buckets[due_date]
+        bucket.discard(task_id)
+        if not bucket:
+            del self.due_buckets[due_date]
+            del self.due_dates[bisect_left(self.due_dates, due_date)]
+
+        if self._is_overdue(task):
+            self.overdue_count -= 1
+            self._count(self.user_overdue, task.username, -1)
+
+    @staticmethod
+    def _count(counter, username, step):
+        """Add step to a username's entry in a counter dictionary."""
+
+        counter[username] = counter.get(username, 0) + step
+
+
+# === Task file and journal ===
+def task_to_line(task):
+    """Convert a task to a line of tasks.txt."""
+
+    str_attrs = [
+        task.username,
+        task.title,
+        task.description,
+        task.due_date.isoformat(),
+        task.assigned_date.isoformat(),
+        "Yes" if task.completed else "No"
+    ]
+    return ";".join(str_attrs)
+
+def line_to_task(line):
+    """Convert a line of tasks.txt to a task."""
+
+    # Split by semicolon and manually add each component
+    username, title, description, due_date, assigned_date, completed = line.split(";")
+    return Task(
+        sys.intern(username),
+        title,
+        description,
+        parse_date(due_date),
+        parse_date(assigned_date),
+        completed == "Yes"
+    )
+
+def load_tasks(path, store):
+    """Stream the tasks in a snapshot file into a task store."""
+
+    with open(path, "r", encoding="utf-8") as task_file:
+        for line in task_file:
+            line = line.rstrip("\n")
+            if line:
+                store.add(line_to_task(line))
+
+
+# === Storage backends ===
+class Storage:
+    """The operations every storage backend provides.
+
+    The menu functions only talk to a storage object, so the text files
+    and the SQLite database can be swapped for each other. Tasks are
+    referred to by an id that the backend chooses.
+    """
+
+    # Goes up with every change, used to tell when reports are out of date
+    version = 0
+
+    # When True, changes are held back and saved together by flush()
+    write_behind = False
+
+    def has_user(self, username):
+        """Check if a user exists."""
+        raise NotImplementedError
+
+    def get_password_hash(self, username):
+        """Return the stored password hash of a user, or None."""
+        raise NotImplementedError
+
+    def set_password_hashes(self, password_hashes):
+        """Replace the stored password hashes of existing users.
+
+        password_hashes is a dictionary of username -> password hash.
+        """
+        raise NotImplementedError
+
+    def check_login(self, username, password):
+        """Check a username and password.
+
+        Plain text or outdated password hashes are upgraded on a
+        successful login.
+        """
+        stored_password = self.get_password_hash(username)
+        if stored_password is None:
+            return False
+
+        matches, new_hash = check_password(password, stored_password)
+        if new_hash is not None:
+            self.set_password_hashes({username: new_hash})
+        return matches
+
+    def usernames(self):
+        """Return every username, in the order they were registered."""
+        raise NotImplementedError
+
+    def user_count(self):
+        """Return the number of users."""
+        raise NotImplementedError
+
+    def users(self):
+        """Return (username, password hash) pairs for every user."""
+        raise NotImplementedError
+
+    def add_user(self, username, password):
+        """Save a new user, hashing their password."""
+        raise NotImplementedError
+
+    def add_user_hashes(self, users):
+        """Save many new users at once.
+
+        users is an iterable of (username, password hash) pairs, so the
+        passwords must already be hashed.
+        """
+        raise NotImplementedError
+
+    def add_task(self, task):
+        """Save a new task and return its id."""
+        raise NotImplementedError
+
+    def complete_task(self, task_id):
+        """Mark a task as complete."""
+        raise NotImplementedError
+
+    def reassign_task(self, task_id, username):
+        """Move a task over to another user."""
+        raise NotImplementedError
+
+    def redate_task(self, task_id, due_date):
+        """Change the due date of a task."""
+        raise NotImplementedError
+
+    def get_task(self, task_id):
+        """Return a single task."""
+        raise NotImplementedError
+
+    def all_tasks(self):
+        """Return every task, oldest first."""
+        raise NotImplementedError
+
+    def tasks_for_user(self, username):
+        """Return (task id, task) pairs for a user, oldest first."""
+        raise NotImplementedError
+
+    def overdue_tasks(self, today):
+        """Return (task id, task) pairs of incomplete tasks due before today."""
+        raise NotImplementedError
+
+    def report_counts(self, today):
+        """Return the counts the reports are built from.
+
+        Returns (total, completed, overdue) for all tasks and a dictionary
+        of username -> (total, completed, overdue) for users with tasks.
+        """
+        raise NotImplementedError
+
+    def import_all(self, users, tasks):
+        """Replace everything stored with the given users and tasks."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Save the changes held back while write_behind is on."""
+
+    def close(self):
+        """Save anything outstanding and release the files."""
+
+
+class TextStorage(Storage):
+    """Keeps everything in memory and saves it to the semicolon separated
+    user.txt and tasks.txt files.
+
+    Changes to tasks are appended to the journal and folded back into the
+    tasks.txt snapshot once enough of them have built up.
+    """
+
+    def __init__(self, user_file=USER_FILE, tasks_file=TASKS_FILE, journal_file=JOURNAL_FILE):
+        self.user_file = user_file
+        self.tasks_file = tasks_file
+        self.journal_file = journal_file
+        self.pending_records = []
+
+        # Create tasks.txt if it doesn't exist
+        if not os.path.exists(tasks_file):
+            with open(tasks_file, "w", encoding="utf-8") as default_file:
+                pass
+
+        self.tasks = TaskStore()
+        load_tasks(tasks_file, self.tasks)
+
+        # Rebuild the latest state by replaying the changes made since the
+        # last snapshot, then fold them into tasks.txt so the journal
+        # starts empty. That includes a journal holding nothing but a line
+        # cut off by a crash, or the next record would be joined onto it.
+        self.journal_records = self.replay_journal()
+        if self.journal_records or (os.path.exists(journal_file) and os.path.getsize(journal_file)):
+            self.compact()
+
+        # If no user.txt file, write one with a default account
+        if not os.path.exists(user_file):
+            with open(user_file, "w", encoding="utf-8") as default_file:
+                default_file.write(f"admin;{hash_password('password')}\n")
+
+        # Read in the users and convert to a dictionary. A user's password
+        # may be saved more than once, the last record wins.
+        self.username_password = {}
+        self.user_records = 0
+        unfinished = False
+        with open(user_file, "r", encoding="utf-8") as user_data:
+            for user in user_data:
+                # Skip blank lines
+                unfinished = not user.endswith("\n")
+                user = user.rstrip("\n")
+                if ";" not in user:
+                    continue
+
+                # Every record ends with a newline, so a last line without
+                # one was cut off by a crash, unless it is a whole record
+                # from a user.txt written before that was the case
+                username, password = user.split(";", 1)
+                if unfinished and is_cut_off_hash(password):
+                    continue
+                self.username_password[username] = password
+                self.user_records += 1
+
+        # Start the next record on a line of its own
+        if unfinished:
+            self.write_users()
+
+    @property
+    def version(self):
+        return self.tasks.version
+
+    def has_user(self, username):
+        return username in self.username_password
+
+    def get_password_hash(self, username):
+        return self.username_password.get(username)
+
+    def set_password_hashes(self, password_hashes):
+        # Append the new hashes rather than rewriting user.txt for every
+        # upgraded login, the old records are dropped once they outnumber
+        # the users
+        self.username_password.update(password_hashes)
+        self.append_users(password_hashes.items())
+        if self.user_records > 2 * len(self.username_password):
+            self.write_users()
+
+    def usernames(self):
+        return list(self.username_password)
+
+    def user_count(self):
+        return len(self.username_password)
+
+    def users(self):
+        return list(self.username_password.items())
+
+    def add_user(self, username, password):
+        self.add_user_hashes([(username, hash_password(password))])
+
+    def add_user_hashes(self, users):
+        # Append the new users instead of rewriting user.txt
+        users = list(users)
+        self.username_password.update(users)
+        self.append_users(users)
+
+    def append_users(self, users):
+        """Append (username, password hash) records to user.txt.
+
+        Every record ends with a newline, so one cut off by a crash can be
+        told apart from a whole one.
+        """
+        lines = [f"{username};{password_hash}\n" for username, password_hash in users]
+        if not lines:
+            return
+
+        # A single write, so the records are added all together
+        with open(self.user_file, "a", encoding="utf-8") as out_file:
+            out_file.write("".join(lines))
+            out_file.flush()
+            os.fsync(out_file.fileno())
+        self.user_records += len(lines)
+
+    def write_users(self):
+        """Write every user to user.txt.
+
+        Like the tasks snapshot, the file is written to a temporary file
+        and renamed into place, so a crash can't leave it half written.
+        """
+        temp_file = self.user_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as out_file:
+            user_data = []
+            for username, password in self.username_password.items():
+                user_data.append(f"{username};{password}\n")
+            out_file.write("".join(user_data))
+            out_file.flush()
+            os.fsync(out_file.fileno())
+        os.replace(temp_file, self.user_file)
+        self.user_records = len(self.username_password)
+
+    def add_task(self, task):
+        task_id = self.tasks.add(task)
+        self.append_journal("add", str(task_id), task_to_line(task))
+        return task_id
+
+    def complete_task(self, task_id):
+        self.tasks.complete(task_id)
+        self.append_journal("complete", str(task_id))
+
+    def reassign_task(self, task_id, username):
+        self.tasks.reassign(task_id, username)
+        self.append_journal("reassign", str(task_id), username)
+
+    def redate_task(self, task_id, due_date):
+        self.tasks.redate(task_id, due_date)
+        self.append_journal("redate", str(task_id), due_date.isoformat())
+
+    def get_task(self, task_id):
+        return self.tasks[task_id]
+
+    def all_tasks(self):
+        return iter(self.tasks)
+
+    def tasks_for_user(self, username):
+        return self.tasks.tasks_for_user(username)
+
+    def overdue_tasks(self, today):
+        return self.tasks.overdue(today)
+
+    def report_counts(self, today):
+        # The task store keeps running counts, so only the overdue
+        # counts need bringing up to date for today
+        store = self.tasks
+        store.refresh_overdue(today)
+        per_user = {
+            username: (
+                len(task_ids),
+                store.user_completed.get(username, 0),
+                store.user_overdue.get(username, 0)
+            )
+            for username, task_ids in store.by_user.items()
+        }
+        return (len(store), len(store.completed), store.overdue_count), per_user
+
+    def import_all(self, users, tasks):
+        self.username_password = dict(users)
+        self.write_users()
+
+        # Stream the tasks straight into a new snapshot, then load it
+        temp_file = self.tasks_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as task_file:
+            for task in tasks:
+                task_file.write(task_to_line(task) + "\n")
+            task_file.flush()
+            os.fsync(task_file.fileno())
+        os.replace(temp_file, self.tasks_file)
+        with open(self.journal_file, "w", encoding="utf-8"):
+            pass
+        self.journal_records = 0
+
+        self.tasks = TaskStore()
+        load_tasks(self.tasks_file, self.tasks)
+
+    def flush(self):
+        if not self.pending_records:
+            return
+
+        # Write the whole batch of records with a single fsync
+        with open(self.journal_file, "a", encoding="utf-8") as journal:
+            journal.write("".join(self.pending_records))
+            journal.flush()
+            os.fsync(journal.fileno())
+        self.pending_records = []
+
+        if self.journal_records >= max(COMPACT_AFTER, len(self.tasks) // 4):
+            self.compact()
+
+    def close(self):
+        # Fold the journal into tasks.txt before leaving
+        self.flush()
+        if self.journal_records:
+            self.compact()
+
+    def append_journal(self, record_type, *fields):
+        """Append a single change record to the journal.
+
+        Record types are add, complete, reassign and redate. Every record
+        names the task by its id in the task store, so replaying the same
+        record twice gives the same result.
+        """
+        record = ";".join((record_type,) + fields) + "\n"
+        self.journal_records += 1
+
+        # Leave the record for flush() to write with the rest of its batch
+        if self.write_behind:
+            self.pending_records.append(record)
+            return
+
+        with open(self.journal_file, "a", encoding="utf-8") as journal:
+            journal.write(record)
+            journal.flush()
+            os.fsync(journal.fileno())
+
+        if self.journal_records >= max(COMPACT_AFTER, len(self.tasks) // 4):
+            self.compact()
+
+    def replay_journal(self):
+        """Apply the journal records to the task store, returns how many
+        were applied."""
+
+        if not os.path.exists(self.journal_file):
+            return 0
+
+        applied = 0
+        with open(self.journal_file, "r", encoding="utf-8") as journal:
+            for line in journal:
+                # A line without a newline was cut off by a crash, ignore it
+                if not line.endswith("\n"):
+                    break
+
+                record_type, task_id, *fields = line.rstrip("\n").split(";", 2)
+                task_id = int(task_id)
+
+                # Skip a change to a task that doesn't exist, which older
+                # versions could journal for a bad id
+                if record_type != "add" and not 0 <= task_id < len(self.tasks):
+                    continue
+
+                if record_type == "add":
+                    # The task may already be in the snapshot if a crash
+                    # happened between compacting and clearing the journal
+                    if task_id == len(self.tasks):
+                        self.tasks.add(line_to_task(fields[0]))
+                elif record_type == "complete":
+                    self.tasks.complete(task_id)
+                elif record_type == "reassign":
+                    self.tasks.reassign(task_id, fields[0])
+                elif record_type == "redate":
+                    self.tasks.redate(task_id, parse_date(fields[0]))
+                applied += 1
+
+        return applied
+
+    def compact(self):
+        """Write a fresh tasks.txt snapshot and clear the journal.
+
+        The snapshot is written to a temporary file first and then renamed
+        over tasks.txt, so a crash can never leave a half written file.
+        """
+        temp_file = self.tasks_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as task_file:
+            task_file.write("\n".join(task_to_line(task) for task in self.tasks))
+            task_file.flush()
+            os.fsync(task_file.fileno())
+        os.replace(temp_file, self.tasks_file)
+
+        # Only clear the journal once the new snapshot is safely in place
+        with open(self.journal_file, "w", encoding="utf-8"):
+            pass
+        self.journal_records = 0
+
+
+class SqliteStorage(Storage):
+    """Keeps users and tasks in an SQLite database.
+
+    Per-user views, edits and reports are indexed queries, so the tasks
+    never need to be loaded into memory all at once.
+    """
+
+    TASK_COLUMNS = "id, username, title, description, due_date, assigned_date, completed"
+
+    def __init__(self, path=DATABASE_FILE):
+        self.connection = sqlite3.connect(path)
+        # WAL lets readers carry on while a change is being written
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.changes = 0
+
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "username TEXT PRIMARY KEY, password TEXT NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY, username TEXT NOT NULL, "
+                "title TEXT NOT NULL, description TEXT NOT NULL, "
+                "due_date TEXT NOT NULL, assigned_date TEXT NOT NULL, "
+                "completed INTEGER NOT NULL DEFAULT 0)"
+            )
+            # Covers the per-user lookups and the report counts
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_by_username "
+                "ON tasks (username, completed, due_date)"
+            )
+            # Only incomplete tasks can be overdue
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_by_due_date "
+                "ON tasks (due_date) WHERE completed = 0"
+            )
+
+            # Start with a default account, like user.txt does
+            if self.user_count() == 0:
+                self.connection.execute(
+                    "INSERT INTO users VALUES (?, ?)", ("admin", hash_password("password"))
+                )
+
+    @property
+    def version(self):
+        # data_version changes when another connection commits a change
+        data_version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        return (self.changes, data_version)
+
+    @staticmethod
+    def row_to_task(row):
+        """Convert a row from the tasks table to (task id, task)."""
+
+        task_id, username, title, description, due_date, assigned_date, completed = row
+        task = Task(
+            username,
+            title,
+            description,
+            parse_date(due_date),
+            parse_date(assigned_date),
+            bool(completed)
+        )
+        return task_id, task
+
+    def write(self, sql, parameters):
+        """Run a single change, committing it unless write_behind is on."""
+
+        cursor = self.connection.execute(sql, parameters)
+        self.changes += 1
+        if not self.write_behind:
+            self.connection.commit()
+        return cursor
+
+    def has_user(self, username):
+        return self.get_password_hash(username) is not None
+
+    def get_password_hash(self, username):
+        row = self.connection.execute(
+            "SELECT password FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_password_hashes(self, password_hashes):
+        self.connection.executemany(
+            "UPDATE users SET password = ? WHERE username = ?",
+            ((password_hash, username) for username, password_hash in password_hashes.items())
+        )
+        self.changes += 1
+        if not self.write_behind:
+            self.connection.commit()
+
+    def usernames(self):
+        return [row[0] for row in self.connection.execute("SELECT username FROM users ORDER BY rowid")]
+
+    def user_count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def users(self):
+        return self.connection.execute("SELECT username, password FROM users ORDER BY rowid")
+
+    def add_user(self, username, password):
+        self.write("INSERT INTO users VALUES (?, ?)", (username, hash_password(password)))
+
+    def add_user_hashes(self, users):
+        self.connection.executemany("INSERT INTO users VALUES (?, ?)", users)
+        self.changes += 1
+        if not self.write_behind:
+            self.connection.commit()
+
+    def add_task(self, task):
+        cursor = self.write(
+            "INSERT INTO tasks (username, title, description, due_date, assigned_date, completed) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (task.username, task.title, task.description,
+             task.due_date.isoformat(), task.assigned_date.isoformat(), int(task.completed))
+        )
+        return cursor.lastrowid
+
+    def complete_task(self, task_id):
+        self.write("UPDATE tasks SET completed = 1 WHERE id = ?", (task_id,))
+
+    def reassign_task(self, task_id, username):
+        self.write("UPDATE tasks SET username = ? WHERE id = ?", (username, task_id))
+
+    def redate_task(self, task_id, due_date):
+        self.write("UPDATE tasks SET due_date = ? WHERE id = ?", (due_date.isoformat(), task_id))
+
+    def get_task(self, task_id):
+        row = self.connection.execute(
+            f"SELECT {self.TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No task with id {task_id}")
+        return self.row_to_task(row)[1]
+
+    def all_tasks(self):
+        # Stream the rows instead of fetching them all at once
+        cursor = self.connection.execute(f"SELECT {self.TASK_COLUMNS} FROM tasks ORDER BY id")
+        return (self.row_to_task(row)[1] for row in cursor)
+
+    def tasks_for_user(self, username):
+        cursor = self.connection.execute(
+            f"SELECT {self.TASK_COLUMNS} FROM tasks WHERE username = ? ORDER BY id", (username,)
+        )
+        return [self.row_to_task(row) for row in cursor]
+
+    def overdue_tasks(self, today):
+        cursor = self.connection.execute(
+            f"SELECT {self.TASK_COLUMNS} FROM tasks "
+            "WHERE completed = 0 AND due_date < ? ORDER BY due_date, id",
+            (today.isoformat(),)
+        )
+        return [self.row_to_task(row) for row in cursor]
+
+    def report_counts(self, today):
+        # Dates are stored as YYYY-MM-DD, so comparing the text compares
+        # the dates. This only reads the username index.
+        cursor = self.connection.execute(
+            "SELECT username, COUNT(*), SUM(completed), "
+            "SUM(completed = 0 AND due_date < ?) FROM tasks GROUP BY username",
+            (today.isoformat(),)
+        )
+        per_user = {}
+        total = completed = overdue = 0
+        for username, user_total, user_completed, user_overdue in cursor:
+            per_user[username] = (user_total, user_completed, user_overdue)
+            total += user_total
+            completed += user_completed
+            overdue += user_overdue
+        return (total, completed, overdue), per_user
+
+    def import_all(self, users, tasks):
+        with self.connection:
+            self.connection.execute("DELETE FROM users")
+            self.connection.execute("DELETE FROM tasks")
+            self.connection.executemany("INSERT INTO users VALUES (?, ?)", users)
+            self.connection.executemany(
+                "INSERT INTO tasks (username, title, description, due_date, assigned_date, completed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (task.username, task.title, task.description,
+                     task.due_date.isoformat(), task.assigned_date.isoformat(), int(task.completed))
+                    for task in tasks
+                )
+            )
+        self.changes += 1
+
+    def flush(self):
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+
+def open_storage(backend, database=DATABASE_FILE, host=SERVER_HOST, port=SERVER_PORT):
+    """Open the 'text', 'sqlite' or 'remote' storage backend."""
+
+    if backend == "sqlite":
+        return SqliteStorage(database)
+    if backend == "remote":
+        return RemoteStorage(host, port)
+    return TextStorage()
+
+def migrate_storage(source, target):
+    """Copy every user and task from one storage backend into another."""
+
+    target.import_all(source.users(), source.all_tasks())
+
+def hash_stored_passwords(storage):
+    """Hash every password still stored as plain text, returns how many."""
+
+    password_hashes = {
+        username: hash_password(stored_password)
+        for username, stored_password in storage.users()
+        if not looks_like_hash(stored_password)
+    }
+    if password_hashes:
+        storage.set_password_hashes(password_hashes)
+    return len(password_hashes)
+
+def check_new_user(username, password):
+    """Return why a new username and password can't be saved, or None."""
+
+    if not username:
+        return "empty username"
+    if not password:
+        return "empty password"
+    # These would break the lines of user.txt
+    if any(character in username + password for character in ";\r\n"):
+        return "contains ';' or a line break"
+    return None
+
+def register_users(storage, users, kdf=PASSWORD_KDF, cost=None, processes=None, chunk_size=10_000):
+    """Register many users at once.
+
+    users is any iterable of (username, password) pairs and is read in
+    chunks, so it never has to fit in memory. Duplicates are checked
+    against a set of every known username, the passwords of each chunk are
+    hashed on all CPU cores and then saved in a single write.
+
+    A lower cost makes large imports much faster, and as needs_rehash()
+    sees the old settings, each password is upgraded when its user first
+    logs in.
+
+    Returns the number of users added and a list of (username, reason)
+    for the ones that were rejected.
+    """
+    known_usernames = set(storage.usernames())
+    rejected = []
+    added = 0
+    hasher = partial(hash_password, kdf=kdf, cost=cost)
+    workers = processes or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(processes) as pool:
+        users = iter(users)
+        while True:
+            chunk = list(islice(users, chunk_size))
+            if not chunk:
+                break
+
+            # Validate the whole chunk before hashing anything
+            usernames = []
+            passwords = []
+            for row in chunk:
+                if len(row) != 2:
+                    rejected.append((",".join(row), "expected a username and a password"))
+                    continue
+
+                username, password = row
+                problem = check_new_user(username, password)
+                if problem is None and username in known_usernames:
+                    problem = "username already exists"
+                if problem is not None:
+                    rejected.append((username, problem))
+                    continue
+
+                known_usernames.add(username)
+                usernames.append(username)
+                passwords.append(password)
+
+            password_hashes = pool.map(hasher, passwords, chunksize=max(1, len(passwords) // (4 * workers)))
+            storage.add_user_hashes(zip(usernames, password_hashes))
+            added += len(usernames)
+
+    return added, rejected
+
+def read_user_csv(path):
+    """Yield the (username, password) rows of a CSV file, skipping a
+    header row and blank lines."""
+
+    with open(path, "r", encoding="utf-8", newline="") as csv_file:
+        for row_number, row in enumerate(csv.reader(csv_file)):
+            if row_number == 0 and [column.strip().lower() for column in row] == ["username", "password"]:
+                continue
+            if row:
+                yield row
+
+
+# === Server mode ===
+def task_to_wire(task_id, task):
+    """Convert a task to a dictionary that can be sent as JSON."""
+
+    return {
+        "id": task_id,
+        "username": task.username,
+        "title": task.title,
+        "description": task.description,
+        "due_date": task.due_date.isoformat(),
+        "assigned_date": task.assigned_date.isoformat(),
+        "completed": task.completed
+    }
+
+def wire_to_task(data):
+    """Convert a dictionary received as JSON back to (task id, task)."""
+
+    task = Task(
+        data["username"],
+        data["title"],
+        data["description"],
+        parse_date(data["due_date"]),
+        parse_date(data["assigned_date"]),
+        data["completed"]
+    )
+    return data.get("id"), task
+
+
+class TaskServer:
+    """Serves a single storage to many clients at once.
+
+    Each client sends one JSON request per line and gets one JSON response
+    per line. Requests are handled one at a time on the event loop, so
+    changes never overlap. Changes are saved in batches: every
+    FLUSH_INTERVAL seconds the storage is flushed once for all the changes
+    made since the last flush, and only then are those clients answered.
+    """
+
+    FLUSH_INTERVAL = 0.005
+
+    # Requests that change the storage and have to be saved before replying
+    WRITE_OPS = {"add_user", "add_task", "complete_task", "reassign_task", "redate_task"}
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.storage.write_behind = True
+        self.flush_waiters = []
+        self.login_cache = LoginCache()
+
+    async def serve(self, host, port):
+        """Accept clients until the server is stopped."""
+
+        server = await asyncio.start_server(self.handle_client, host, port)
+        flusher = asyncio.create_task(self.flush_loop())
+
+        # Stop cleanly on Ctrl+C or when the process is terminated
+        stop = asyncio.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signal_number, stop.set)
+            except NotImplementedError:
+                pass  # Not available on Windows, Ctrl+C still works there
+
+        print(f"Task server listening on {host}:{server.sockets[0].getsockname()[1]}", flush=True)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            flusher.cancel()
+            self.storage.close()
+        print("Task server stopped.")
+
+    async def flush_loop(self):
+        """Save the changes waiting to be flushed, then answer their clients."""
+
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            if not self.flush_waiters:
+                continue
+
+            waiters, self.flush_waiters = self.flush_waiters, []
+            try:
+                self.storage.flush()
+            except Exception as error:
+                # Tell the waiting clients that saving failed, with an
+                # OSError from the text files or an sqlite3.Error from the
+                # database, and keep flushing for everyone else
+                for waiter in waiters:
+                    waiter.set_exception(error)
+            else:
+                for waiter in waiters:
+                    waiter.set_result(None)
+
+    async def handle_client(self, reader, writer):
+        """Answer the requests from one client until it disconnects."""
+
+        # Every connection logs in for itself
+        session = {"username": None}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    request = json.loads(line)
+                    if request["op"] == "login":
+                        result = await self.login(session, *request.get("args", []))
+                    else:
+                        result = self.dispatch(session, request["op"], request.get("args", []))
+                    if request["op"] in self.WRITE_OPS:
+                        waiter = asyncio.get_running_loop().create_future()
+                        self.flush_waiters.append(waiter)
+                        await waiter
+                    response = {"ok": True, "result": result}
+                except (KeyError, IndexError, TypeError, ValueError, OSError, sqlite3.Error) as error:
+                    response = {"ok": False, "error": str(error)}
+
+                writer.write((json.dumps(response) + "\n").encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def login(self, session, username, password):
+        """Log a client in.
+
+        Checking a password that isn't cached takes tens of milliseconds,
+        so it runs on a worker thread and the other clients carry on in
+        the meantime. The cache and the storage are only used from the
+        event loop.
+        """
+        storage = self.storage
+        stored_password = storage.get_password_hash(username)
+        if stored_password is None:
+            return False
+
+        if not self.login_cache.is_cached(username, stored_password, password):
+            matches, new_hash = await asyncio.get_running_loop().run_in_executor(
+                None, check_password, password, stored_password
+            )
+            if not matches:
+                return False
+
+            # Upgrade the hash, unless it was changed while checking
+            if new_hash is not None and storage.get_password_hash(username) == stored_password:
+                storage.set_password_hashes({username: new_hash})
+            self.login_cache.remember(username, storage.get_password_hash(username), password)
+
+        session["username"] = username
+        return True
+
+    def dispatch(self, session, op, args):
+        """Run a single request against the storage and return the result.
+        Logins are handled by login()."""
+
+        storage = self.storage
+
+        # This works before logging in
+        if op == "has_user":
+            return storage.has_user(*args)
+
+        current_user = session["username"]
+        if current_user is None:
+            raise PermissionError("Please log in first")
+
+        if op == "version":
+            return storage.version
+        elif op == "usernames":
+            return storage.usernames()
+        elif op == "user_count":
+            return storage.user_count()
+        elif op == "add_user":
+            username, password = args
+            if storage.has_user(username):
+                raise ValueError("This username already exists")
+            storage.add_user(username, password)
+            return None
+        elif op == "add_task":
+            task_id, task = wire_to_task(args[0])
+            if not storage.has_user(task.username):
+                raise ValueError("User does not exist")
+            return storage.add_task(task)
+        elif op == "get_task":
+            return task_to_wire(args[0], storage.get_task(self.task_id(args[0])))
+        elif op == "all_tasks":
+            return [task_to_wire(None, task) for task in storage.all_tasks()]
+        elif op == "tasks_for_user":
+            return [task_to_wire(task_id, task) for task_id, task in storage.tasks_for_user(args[0])]
+        elif op == "overdue_tasks":
+            return [task_to_wire(task_id, task) for task_id, task in storage.overdue_tasks(parse_date(args[0]))]
+        elif op == "report_counts":
+            return storage.report_counts(parse_date(args[0]))
+        elif op in ("complete_task", "reassign_task", "redate_task"):
+            # Users can only change their own tasks, like in view_mine()
+            task_id = self.task_id(args[0])
+            if storage.get_task(task_id).username != current_user:
+                raise PermissionError("You can only change your own tasks")
+            if op == "complete_task":
+                storage.complete_task(task_id)
+            elif op == "reassign_task":
+                if not storage.has_user(args[1]):
+                    raise ValueError("User does not exist")
+                storage.reassign_task(task_id, args[1])
+            else:
+                storage.redate_task(task_id, parse_date(args[1]))
+            return None
+
+        raise ValueError(f"Unknown request: {op}")
+
+    @staticmethod
+    def task_id(value):
+        """Check a task id sent by a client."""
+
+        # bool is a kind of int, but true isn't a task id
+        if type(value) is not int or value < 0:
+            raise KeyError(f"No task with id {value}")
+        return value
+
+
+class RemoteStorage(Storage):
+    """Storage that sends every operation to a TaskServer.
+
+    This lets the normal menu run as a thin client of the server.
+    """
+
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT):
+        self.connection = socket.create_connection((host, port))
+        self.stream = self.connection.makefile("rwb")
+
+    def request(self, op, *args):
+        """Send a request to the server and return its result."""
+
+        self.stream.write((json.dumps({"op": op, "args": args}) + "\n").encode("utf-8"))
+        self.stream.flush()
+
+        line = self.stream.readline()
+        if not line:
+            raise ConnectionError("The task server closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    @property
+    def version(self):
+        return self.request("version")
+
+    def has_user(self, username):
+        return self.request("has_user", username)
+
+    def check_login(self, username, password):
+        return self.request("login", username, password)
+
+    def usernames(self):
+        return self.request("usernames")
+
+    def user_count(self):
+        return self.request("user_count")
+
+    def add_user(self, username, password):
+        self.request("add_user", username, password)
+
+    def add_task(self, task):
+        return self.request("add_task", task_to_wire(None, task))
+
+    def complete_task(self, task_id):
+        self.request("complete_task", task_id)
+
+    def reassign_task(self, task_id, username):
+        self.request("reassign_task", task_id, username)
+
+    def redate_task(self, task_id, due_date):
+        self.request("redate_task", task_id, due_date.isoformat())
+
+    def get_task(self, task_id):
+        return wire_to_task(self.request("get_task", task_id))[1]
+
+    def all_tasks(self):
+        return [wire_to_task(data)[1] for data in self.request("all_tasks")]
+
+    def tasks_for_user(self, username):
+        return [wire_to_task(data) for data in self.request("tasks_for_user", username)]
+
+    def overdue_tasks(self, today):
+        return [wire_to_task(data) for data in self.request("overdue_tasks", today.isoformat())]
+
+    def report_counts(self, today):
+        totals, per_user = self.request("report_counts", today.isoformat())
+        return tuple(totals), {username: tuple(counts) for username, counts in per_user.items()}
+
+    def close(self):
+        self.stream.close()
+        self.connection.close()
+
+
 # === Helper Functions (abstraction) ===
 def reg_user():
     """Register a new user."""
@@ -31,7 +1511,7 @@ def reg_user():
         new_username = input("New Username: ")
 
         # Check if username exists
-        if new_username in username_password:
+        if storage.has_user(new_username):
             #  Print error message
             print("This username already exists. Please try a different one.\n")
             continue # Ask again for a username
@@ -42,15 +1522,9 @@ def reg_user():
 
         # Check if the new password and confirmed password are the same.
         if new_password == confirm_password:
-            # If they are the same, add them to the user.txt file,
+            # If they are the same, save the new user
             print("New user added")
-            username_password[new_username] = new_password
-
-            with open("user.txt", "w", encoding="utf-8") as out_file:
-                user_data = []
-                for username, password in username_password.items():
-                    user_data.append(f"{username};{password}")
-                out_file.write("\n".join(user_data))
+            storage.add_user(new_username, new_password)
             break # Exit loop once new user is added
 
         # Otherwise you present a relevant message.
@@ -70,7 +1544,7 @@ def add_task():
     task_username = input("Name of person assigned to task: ")
 
     # Validate username
-    while task_username not in username_password:
+    while not storage.has_user(task_username):
         print("User does not exist. Please enter a valid username.")
         task_username = input("Name of person assigned to task: ")
         
@@ -82,74 +1556,53 @@ def add_task():
     while True:
         try:
             task_due_date = input("Due date of task (YYYY-MM-DD): ")
-            due_date_time = datetime.strptime(task_due_date, DATETIME_STRING_FORMAT)
+            due_date = datetime.strptime(task_due_date, DATETIME_STRING_FORMAT).date()
             break
 
         except ValueError:
             print("Invalid datetime format. Please use the format specified")
 
-    # Add task details to dictionary
+    # Create the new task
     current_date = date.today()
-    new_task = {
-        "username": task_username,
-        "title": task_title,
-        "description": task_description,
-        "due_date": due_date_time,
-        "assigned_date": current_date,
-        "completed": False
-    }
+    new_task = Task(task_username, task_title, task_description, due_date, current_date)
 
-    # Append to the in-memory task list
-    task_list.append(new_task)
-
-    # Write all tasks to the file
-    with open("tasks.txt", "w", encoding="utf-8") as task_file:
-        task_list_to_write = []
-        for task in task_list:
-            str_attrs = [
-                task['username'],
-                task['title'],
-                task['description'],
-                task['due_date'].strftime(DATETIME_STRING_FORMAT),
-                task['assigned_date'].strftime(DATETIME_STRING_FORMAT),
-                "Yes" if task['completed'] else "No"
-            ]
-            task_list_to_write.append(";".join(str_attrs))
-        task_file.write("\n".join(task_list_to_write))
+    # Save the new task
+    storage.add_task(new_task)
     print("Task successfully added.")
 
 def view_all():
     """View all tasks."""
 
-    for task in task_list:
+    for task in storage.all_tasks():
         display = (
-            f"Task: \t\t {task['title']}\n"
-            f"Assigned to: \t {task['username']}\n"
-            f"Date Assigned: \t {task['assigned_date'].strftime(DATETIME_STRING_FORMAT)}\n"
-            f"Due Date: \t {task['due_date'].strftime(DATETIME_STRING_FORMAT)}\n"
-            f"Task Description: \n {task['description']}\n"
+            f"Task: \t\t {task.title}\n"
+            f"Assigned to: \t {task.username}\n"
+            f"Date Assigned: \t {task.assigned_date.strftime(DATETIME_STRING_FORMAT)}\n"
+            f"Due Date: \t {task.due_date.strftime(DATETIME_STRING_FORMAT)}\n"
+            f"Task Description: \n {task.description}\n"
         )
         print(display)
 
 def view_mine():
     """View my tasks."""
 
-    user_tasks = [task for task in task_list if task['username'] == current_user]
+    # Keep each task's id, the storage refers to tasks by it
+    user_tasks = storage.tasks_for_user(current_user)
 
     if not user_tasks:
         print("You have no tasks to display.")
         return
 
     # Display tasks with numbers
-    for i, task in enumerate(user_tasks, start=1): # Add numbering
+    for i, (task_id, task) in enumerate(user_tasks, start=1): # Add numbering
             display = (
                 f"Task {i}:\n"
-                f"  Title: {task['title']}\n"
-                f"  Assigned to: {task['username']}\n"
-                f"  Date Assigned: {task['assigned_date'].strftime(DATETIME_STRING_FORMAT)}\n"
-                f"  Due Date: \t {task['due_date'].strftime(DATETIME_STRING_FORMAT)}\n"
-                f"  Task Description: {task['description']}\n"
-                f"  Completed: {'Yes' if task['completed'] else 'No'}\n"
+                f"  Title: {task.title}\n"
+                f"  Assigned to: {task.username}\n"
+                f"  Date Assigned: {task.assigned_date.strftime(DATETIME_STRING_FORMAT)}\n"
+                f"  Due Date: \t {task.due_date.strftime(DATETIME_STRING_FORMAT)}\n"
+                f"  Task Description: {task.description}\n"
+                f"  Completed: {'Yes' if task.completed else 'No'}\n"
                 f"{'-'*40}\n"
             )
             print(display)
@@ -164,10 +1617,10 @@ def view_mine():
                 return
                 
             elif 1 <= task_choice <= len(user_tasks):
-                chosen_task = user_tasks[task_choice - 1]
+                chosen_id, chosen_task = user_tasks[task_choice - 1]
 
                 # Display chosen task title
-                print(f"\nYou selected: {chosen_task['title']}")
+                print(f"\nYou selected: {chosen_task.title}")
                 print("1 - Mark task as complete")
                 print("2 - Edit task")
                 print("3 - Return to main menu")
@@ -176,15 +1629,15 @@ def view_mine():
 
                 # === Mark as Complete ===
                 if action == "1":
-                    if chosen_task['completed']:
+                    if chosen_task.completed:
                         print("This task is marked as complete.")
                     else:
-                        chosen_task['completed'] = True
+                        storage.complete_task(chosen_id)
                         print("Task marked as complete.\n")
 
                 # === Edit task ===
                 if action == "2":
-                    if chosen_task['completed']:
+                    if chosen_task.completed:
                         print("You cannot edit a completed task.\n")
                     else:
                         print("1 - Edit the username assigned to this task")
@@ -194,8 +1647,8 @@ def view_mine():
                         # Edit username
                         if edit_choice == "1":
                             new_user = input("Enter the username: ")
-                            if new_user in username_password:
-                                chosen_task['username'] = new_user
+                            if storage.has_user(new_user):
+                                storage.reassign_task(chosen_id, new_user)
                                 print("Username updated successfully.")
                             else:
                                 print("This username does not exist. Please register the user first.")
@@ -204,13 +1657,13 @@ def view_mine():
                         elif edit_choice == "2":
                             try:
                                 new_due_date = input("Enter the new due date (YYY-MM-DD): ")
-                                chosen_task['due_date'] = datetime.strptime(new_due_date, DATETIME_STRING_FORMAT)
+                                storage.redate_task(chosen_id, datetime.strptime(new_due_date, DATETIME_STRING_FORMAT).date())
                                 print("Due date updated successfully.")
                             except ValueError:
                                 print("Invalid date format. Please use YYYY-MM-DD.")
 
-                            else:
-                                print("Invalid choice. Returning to main menu.")
+                        else:
+                            print("Invalid choice. Returning to main menu.")
 
                 elif action == "3":
                     print("Returning to main menu...\n")
@@ -218,21 +1671,6 @@ def view_mine():
                 else:
                     print("Invalid choice. Please try again.")
 
-                # === Save changes to file after any edit ===
-                with open("tasks.txt", "w", encoding="utf-8") as task_file:
-                    task_list_to_write = []
-                    for task in task_list:
-                        str_attrs = [
-                            task['username'],
-                            task['title'],
-                            task['description'],
-                            task['due_date'].strftime(DATETIME_STRING_FORMAT),
-                            task['assigned_date'].strftime(DATETIME_STRING_FORMAT),
-                            "Yes" if task['completed'] else "No"
-                        ]
-                        task_list_to_write.append(";".join(str_attrs))
-                    task_file.write("\n".join(task_list_to_write))
-            
                 print("Changes saved successfully.\n")
                 return  # Exit after saving and returning to main menu
             else:
@@ -241,227 +1679,259 @@ def view_mine():
         except ValueError:
             print("Invalid input. Please enter a valid number.")
         
-def generate_reports():
-    """Generate reports for tasks and users."""
-        
-    # Generate two reports:
-    # 1. task_overview.txt - contains details about each task
-    # 2. user_overview.txt - contains details about each user
+def report_key():
+    """Return what the reports depend on: the storage version, the
+    number of users and today's date."""
+
+    # Users can only be added, so the number of users works as a version
+    return (storage.version, storage.user_count(), date.today())
+
+def render_reports():
+    """Build the text of task_overview.txt and user_overview.txt."""
 
     # Task Overview Report
-    total_tasks = len(task_list)
-    completed_tasks = 0
-    uncompleted_tasks = 0
-    overdue_tasks = 0
-
-    for task in task_list:
-        if task['completed']:
-            completed_tasks += 1
-        else:
-            uncompleted_tasks += 1
-            # Check if overdue
-            if task['due_date'].date() < date.today():
-                overdue_tasks += 1
+    totals, per_user = storage.report_counts(date.today())
+    total_tasks, completed_tasks, overdue_tasks = totals
+    uncompleted_tasks = total_tasks - completed_tasks
 
     # Calculate percentages
     if total_tasks > 0:
-        incomplete_percent = (uncompleted_tasks / total_tasks) * 100 if total_tasks > 0 else 0
-        overdue_percent = (overdue_tasks / total_tasks) * 100 if total_tasks > 0 else 0
+        incomplete_percent = (uncompleted_tasks / total_tasks) * 100
+        overdue_percent = (overdue_tasks / total_tasks) * 100
     else:
         incomplete_percent = 0
         overdue_percent = 0
 
-    # Write to task_overview.txt
-    with open("task_overview.txt", "w", encoding="utf-8") as task_report:
-        task_report.write("=== Task Overview ===\n")
-        task_report.write(f"Total tasks: {total_tasks}\n")
-        task_report.write(f"Completed tasks: {completed_tasks}\n")
-        task_report.write(f"Uncompleted tasks: {uncompleted_tasks}\n")
-        task_report.write(f"Overdue tasks: {overdue_tasks}\n")
-        task_report.write(f"Percentage incomplete: {incomplete_percent:.2f}%\n")
-        task_report.write(f"Percentage overdue: {overdue_percent:.2f}%\n")
+    task_report = (
+        "=== Task Overview ===\n"
+        f"Total tasks: {total_tasks}\n"
+        f"Completed tasks: {completed_tasks}\n"
+        f"Uncompleted tasks: {uncompleted_tasks}\n"
+        f"Overdue tasks: {overdue_tasks}\n"
+        f"Percentage incomplete: {incomplete_percent:.2f}%\n"
+        f"Percentage overdue: {overdue_percent:.2f}%\n"
+    )
 
     # User Overview Report
-    total_users = len(username_password)
-
-    with open("user_overview.txt", "w", encoding="utf-8") as user_report:
-        user_report.write("=== User Overview ===\n")
-        user_report.write(f"Total users: {total_users}\n")
-        user_report.write(f"Total tasks: {total_tasks}\n")
-
-        # Loop through each user
-        for username in username_password:
-            # Get all tasks for this user
-            user_tasks = [task for task in task_list if task ['username'] == username]
-            user_total = len(user_tasks)
-
-            if user_total > 0:
-                user_completed = len([t for t in user_tasks if t['completed']])
-                user_uncompleted = user_total - user_completed
-                user_overdue = len([
-                    t for t in user_tasks
-                    if not t['completed'] and t['due_date'].date() < date.today()
-                ])
-
-                user_task_percent = (user_total / total_tasks) * 100 if total_tasks > 0 else 0
-                user_complete_percent = (user_completed / user_total) * 100
-                user_incomplete_percent = (user_uncompleted / user_total) * 100
-                user_overdue_percent = (user_overdue / user_total) * 100
-            else:
-                # Handle case where user has no tasks
-                user_task_percent = 0
-                user_complete_percent = 0
-                user_incomplete_percent = 0
-                user_overdue_percent = 0
-
-            # Write to file
-            user_report.write(f"User: {username}\n")
-            user_report.write(f"Total tasks: {user_total}\n")
-            user_report.write(f"Percentage of all tasks: {user_task_percent:.2f}%\n")
-            user_report.write(f"Completed: {user_complete_percent:.2f}%\n")
-            user_report.write(f"Incomplete: {user_incomplete_percent:.2f}%\n")
-            user_report.write(f"Overdue: {user_overdue_percent:.2f}%\n")
+    usernames = storage.usernames()
+    total_users = len(usernames)
+    user_report = [
+        "=== User Overview ===\n"
+        f"Total users: {total_users}\n"
+        f"Total tasks: {total_tasks}\n"
+    ]
+
+    # Loop through each user
+    for username in usernames:
+        # Get the counts for this user
+        user_total, user_completed, user_overdue = per_user.get(username, (0, 0, 0))
+
+        if user_total > 0:
+            user_uncompleted = user_total - user_completed
+
+            user_task_percent = (user_total / total_tasks) * 100
+            user_complete_percent = (user_completed / user_total) * 100
+            user_incomplete_percent = (user_uncompleted / user_total) * 100
+            user_overdue_percent = (user_overdue / user_total) * 100
+        else:
+            # Handle case where user has no tasks
+            user_task_percent = 0
+            user_complete_percent = 0
+            user_incomplete_percent = 0
+            user_overdue_percent = 0
+
+        user_report.append(
+            f"User: {username}\n"
+            f"Total tasks: {user_total}\n"
+            f"Percentage of all tasks: {user_task_percent:.2f}%\n"
+            f"Completed: {user_complete_percent:.2f}%\n"
+            f"Incomplete: {user_incomplete_percent:.2f}%\n"
+            f"Overdue: {user_overdue_percent:.2f}%\n"
+        )
+
+    return task_report, "".join(user_report)
+
+def generate_reports():
+    """Generate reports for tasks and users."""
+        
+    # Generate two reports:
+    # 1. task_overview.txt - contains details about each task
+    # 2. user_overview.txt - contains details about each user
+    key = report_key()
+    task_report, user_report = render_reports()
+
+    with open("task_overview.txt", "w", encoding="utf-8") as task_file:
+        task_file.write(task_report)
+    with open("user_overview.txt", "w", encoding="utf-8") as user_file:
+        user_file.write(user_report)
+
+    # Keep the rendered text so display_statistics() can reuse it
+    report_cache["key"] = key
+    report_cache["task_overview"] = task_report
+    report_cache["user_overview"] = user_report
 
     print("Reports generated successfully!")
 
 def display_statistics():
-    """Displays the content of 'task_overview.txt' and 'user_overview.txt'
-    If the reports do not exist, it will first generate them.
+    """Displays the task and user overview reports.
+    The reports are kept in memory and only generated again when a task,
+    a user or the date has changed since they were last generated.
     """
 
-    # Check if the report files exist
-    if not os.path.exists("task_overview.txt") or not os.path.exists("user_overview.txt"):
-        print("\nReport files not found. Generating them now...")
+    # Check if the cached reports are still up to date
+    if report_cache["key"] != report_key():
+        print("\nReports are out of date. Generating them now...")
         generate_reports()
-        print("\nReports have been generated successfully!\n")
+        print()
 
-    # Read and display the report files
+    # Display the reports
     print("=== Task Overview ===")
-    with open("task_overview.txt", "r", encoding="utf-8") as task_file:
-        task_data = task_file.read()
-        print(task_data)
+    print(report_cache["task_overview"])
 
     print("=== User Overview ===")
-    with open("user_overview.txt", "r", encoding="utf-8") as user_file:
-        user_data = user_file.read()
-        print(user_data)
-
-# Create tasks.txt if it doesn't exist
-if not os.path.exists("tasks.txt"):
-    with open("tasks.txt", "w", encoding="utf-8") as default_file:
-        pass
-
-with open("tasks.txt", 'r', encoding="utf-8") as task_file:
-    task_data = task_file.read().split("\n")
-    task_data = [task for task in task_data if task != ""]
-
-task_list = []
-for task in task_data:
-    current_task = {}
+    print(report_cache["user_overview"])
+
+# Only run the program when started directly, so the functions above can be
+# imported (e.g. by benchmark_task_manager.py) without asking for a login
+if __name__ == "__main__":
+    # Choose where the users and tasks are kept
+    parser = argparse.ArgumentParser(description="Task Manager")
+    parser.add_argument("--backend", choices=["text", "sqlite", "remote"], default="text",
+                        help="store data in the text files, an SQLite database or on a task server")
+    parser.add_argument("--database", default=DATABASE_FILE,
+                        help="SQLite database file used by the sqlite backend")
+    parser.add_argument("--migrate-to", choices=["text", "sqlite"],
+                        help="copy all users and tasks from --backend into this backend and exit")
+    parser.add_argument("--hash-passwords", action="store_true",
+                        help="hash any passwords still stored as plain text and exit")
+    parser.add_argument("--import-users", metavar="CSV",
+                        help="register every username,password row of a CSV file and exit")
+    parser.add_argument("--import-cost",
+                        help="password hash cost for --import-users, upgraded when each user logs in")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve --backend to many clients instead of running the menu")
+    parser.add_argument("--host", default=SERVER_HOST, help="task server address")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="task server port")
+    args = parser.parse_args()
+
+    if args.backend == "remote" and (args.serve or args.migrate_to or args.hash_passwords or args.import_users):
+        parser.error("--serve, --migrate-to, --hash-passwords and --import-users need a text or sqlite backend")
+
+    storage = open_storage(args.backend, args.database, args.host, args.port)
+
+    # Upgrade an old user.txt with plain text passwords in one go
+    if args.hash_passwords:
+        print(f"Hashed {hash_stored_passwords(storage)} plain text passwords.")
+        storage.close()
+        sys.exit()
+
+    # Register a whole CSV file of users in one go
+    if args.import_users:
+        start = time.perf_counter()
+        added, rejected = register_users(storage, read_user_csv(args.import_users), cost=args.import_cost)
+        seconds = time.perf_counter() - start
+        storage.close()
+
+        print(f"Imported {added} users in {seconds:.2f} seconds ({added / max(seconds, 1e-9):.0f} users/s).")
+        if rejected:
+            print(f"Rejected {len(rejected)} rows:")
+            for username, reason in rejected[:20]:
+                print(f"  {username}: {reason}")
+            if len(rejected) > 20:
+                print(f"  ... and {len(rejected) - 20} more")
+        sys.exit()
+
+    # Serve the storage to clients using --backend remote
+    if args.serve:
+        try:
+            asyncio.run(TaskServer(storage).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        sys.exit()
+
+    # Migrate between backends instead of running the menu
+    if args.migrate_to:
+        if args.migrate_to == args.backend:
+            parser.error("--migrate-to must be a different backend to --backend")
+        target = open_storage(args.migrate_to, args.database)
+        migrate_storage(storage, target)
+        target.close()
+        storage.close()
+        print(f"Copied {args.backend} storage into {args.migrate_to} storage.")
+        sys.exit()
+
+
+    #====Login Section====
+    # This code checks the username and password against the stored users
+    # to allow a user to login.
+    while True:
+        print("LOGIN")
+        current_user = input("Username: ")
+        current_pass = input("Password: ")
+        if not storage.has_user(current_user):
+            print("User does not exist")
+            continue
+        if not storage.check_login(current_user, current_pass):
+            print("Wrong password")
+            continue
+        print("Login Successful!")
+        break
 
-    # Split by semicolon and manually add each component
-    task_components = task.split(";")
-    current_task['username'] = task_components[0]
-    current_task['title'] = task_components[1]
-    current_task['description'] = task_components[2]
-    current_task['due_date'] = datetime.strptime(task_components[3], DATETIME_STRING_FORMAT)
-    current_task['assigned_date'] = datetime.strptime(task_components[4], DATETIME_STRING_FORMAT)
-    current_task['completed'] = task_components[5] == "Yes"
-
-    task_list.append(current_task)
-
-
-#====Login Section====
-# This code reads usernames and password from the user.txt file to
-# allow a user to login.
-
-# If no user.txt file, write one with a default account
-if not os.path.exists("user.txt"):
-    with open("user.txt", "w", encoding="utf-8") as default_file:
-        default_file.write("admin;password")
-
-# Read in user_data
-with open("user.txt", 'r', encoding="utf-8") as user_file:
-    user_data = user_file.read().split("\n")
-
-# Convert to a dictionary
-username_password = {}
-for user in user_data:
-    username, password = user.split(';')
-    username_password[username] = password
-
-while True:
-    print("LOGIN")
-    current_user = input("Username: ")
-    current_pass = input("Password: ")
-    if current_user not in username_password:
-        print("User does not exist")
-        continue
-    if username_password[current_user] != current_pass:
-        print("Wrong password")
-        continue
-    print("Login Successful!")
-    break
-
-#====Main Menu Section====
-while True:
-    # presenting the menu to the user and
-    # making sure that the user input is converted to lower case.
-    print()
-    menu = input("Select one of the following Options below:\n"
-                 "r - Registering a user\n"
-                 "a - Adding a task\n"
-                 "va - View all tasks\n"
-                 "vm - View my task\n"
-                 "gr - Generate reports\n"
-                 "ds - Display statistics\n"
-                 "e - Exit\n"
-                 ": ").lower()
-
-    # Add a new user to the user.txt file
-    if menu == 'r':
-        reg_user()
-
-    # Allow a user to add a new task to task.txt file
-    elif menu == 'a':
-        add_task()
-
-    # Reads the task from task.txt file and prints to the console in the
-    elif menu == 'va':
-        view_all()
-        
-    # Reads the task from task.txt file and prints to the console in the
-    elif menu == 'vm':
-        view_mine()
+    #====Main Menu Section====
+    while True:
+        # presenting the menu to the user and
+        # making sure that the user input is converted to lower case.
+        print()
+        menu = input("Select one of the following Options below:\n"
+                     "r - Registering a user\n"
+                     "a - Adding a task\n"
+                     "va - View all tasks\n"
+                     "vm - View my task\n"
+                     "gr - Generate reports\n"
+                     "ds - Display statistics\n"
+                     "e - Exit\n"
+                     ": ").lower()
+
+        # Add a new user to the user.txt file
+        if menu == 'r':
+            reg_user()
+
+        # Allow a user to add a new task to task.txt file
+        elif menu == 'a':
+            add_task()
+
+        # Reads the task from task.txt file and prints to the console in the
+        elif menu == 'va':
+            view_all()
+
+        # Reads the task from task.txt file and prints to the console in the
+        elif menu == 'vm':
+            view_mine()
+
+        # Generates two reports: tasks_overview.txt and users_overview.txt
+        elif menu == 'gr':
+            generate_reports()
+
+        # If the user is an admin they can display statistics about number of users
+        # and tasks.
+        elif menu == 'ds':
+            if current_user == 'admin':
+                display_statistics()
+            else:
+                print("Only the admin can view statistics.")
 
-    # Generates two reports: tasks_overview.txt and users_overview.txt
-    elif menu == 'gr':
-        generate_reports()
+        elif menu == 'e':
+            # Save anything outstanding before leaving
+            storage.close()
+            print('Goodbye!!!')
+            break
 
-    # If the user is an admin they can display statistics about number of users
-    # and tasks.
-    elif menu == 'ds':
-        if current_user == 'admin':
-            display_statistics()
         else:
-            print("Only the admin can view statistics.")
-
-    elif menu == 'e':
-        print('Goodbye!!!')
-        break
-
-    else:
-        print("You have made a wrong choice, Please Try again")
+            print("You have made a wrong choice, Please Try again")
 
-    # === Here ends the main program loop ===
+        # === Here ends the main program loop ===
 
 
 # My brother helped me with this code,
 # but mostly trial and error!
 # I updated the doc strings, fixed the generate_reports() function, and fixed indentation issues.
-
-
-
-
-
-